@@ -49,6 +49,28 @@ class Settings(BaseSettings):
         description="Anthropic API key from console.anthropic.com"
     )
 
+    # Additional pooled API keys (comma-separated "key" or "key|base_url|organization")
+    groq_api_keys: str | None = Field(
+        default=None,
+        description="Extra Groq API keys for load balancing"
+    )
+    openai_api_keys: str | None = Field(
+        default=None,
+        description="Extra OpenAI API keys for load balancing"
+    )
+    anthropic_api_keys: str | None = Field(
+        default=None,
+        description="Extra Anthropic API keys for load balancing"
+    )
+    key_cooldown_seconds: float = Field(
+        default=30.0,
+        description="Seconds an exhausted or failing API key is taken out of rotation"
+    )
+    key_failure_threshold: int = Field(
+        default=3,
+        description="Consecutive failures before an API key is cooled down"
+    )
+
     # Application Settings
     debug: bool = Field(
         default=False,
@@ -65,13 +87,185 @@ class Settings(BaseSettings):
         description="WhatsApp Business API base URL"
     )
 
+    # Provider HTTP Transport
+    http_max_connections: int = Field(
+        default=100,
+        description="Maximum number of concurrent connections per provider client"
+    )
+    http_max_keepalive_connections: int = Field(
+        default=20,
+        description="Maximum number of idle keep-alive connections per provider client"
+    )
+    http_keepalive_expiry: float = Field(
+        default=60.0,
+        description="Seconds an idle keep-alive connection is kept in the pool"
+    )
+    http2_enabled: bool = Field(
+        default=True,
+        description="Negotiate HTTP/2 with provider APIs (requires the h2 package)"
+    )
+    http_connect_timeout: float = Field(
+        default=5.0,
+        description="Connection timeout in seconds for provider API calls"
+    )
+    http_timeout: float = Field(
+        default=60.0,
+        description="Read/write/pool timeout in seconds for provider API calls"
+    )
+    provider_warmup_enabled: bool = Field(
+        default=True,
+        description="Pre-open provider connections on startup"
+    )
+    provider_keepalive_interval: float = Field(
+        default=30.0,
+        description="Seconds of inactivity before pinging the provider to keep connections warm (0 disables)"
+    )
+
+    # Delivery Analytics
+    delivery_tracking_max_pending: int = Field(
+        default=10000,
+        description="Maximum number of outbound messages tracked while awaiting status callbacks"
+    )
+
+    # Admission Control & Degradation
+    admission_max_in_flight: int = Field(
+        default=50,
+        description="Maximum number of replies processed concurrently"
+    )
+    admission_target_queue_wait: float = Field(
+        default=2.0,
+        description="Queue wait in seconds treated as full load"
+    )
+    admission_target_latency: float = Field(
+        default=10.0,
+        description="Provider latency in seconds treated as full load"
+    )
+    admission_max_deferred: int = Field(
+        default=1000,
+        description="Maximum number of replies deferred while shedding load"
+    )
+    degraded_max_tokens: int = Field(
+        default=256,
+        description="Reply token limit applied under load"
+    )
+    degraded_max_history: int = Field(
+        default=4,
+        description="Number of history messages sent to the provider under heavy load"
+    )
+    degraded_model: str | None = Field(
+        default=None,
+        description="Cheaper model used under heavy load (defaults to the provider's fallback model)"
+    )
+    busy_message: str = Field(
+        default="We're receiving a lot of messages right now. We'll answer you shortly!",
+        description="Reply sent when load is shed and the answer is deferred"
+    )
+
+    # Deadlines
+    message_deadline: float = Field(
+        default=30.0,
+        description="Time budget for replying to one message, from arrival (seconds)"
+    )
+    mark_read_timeout: float = Field(
+        default=3.0,
+        description="Max time spent marking a message as read (seconds)"
+    )
+    send_reserve: float = Field(
+        default=5.0,
+        description="Time kept free after the provider call for sending the reply or a fallback (seconds)"
+    )
+    deadline_fallback_message: str = Field(
+        default="Sorry, this is taking longer than usual. Please try again in a moment.",
+        description="Reply sent when the answer cannot be generated before the deadline"
+    )
+
+    # Intent Router
+    intents_enabled: bool = Field(
+        default=True,
+        description="Answer commands and menu picks without the LLM"
+    )
+    intents_path: str | None = Field(
+        default=None,
+        description="JSONL file of custom intents (phrases/patterns and replies)"
+    )
+
+    # Similar-Question Answer Cache
+    similarity_index_enabled: bool = Field(
+        default=False,
+        description="Reuse answers for near-duplicate first-turn questions"
+    )
+    similarity_threshold: float = Field(
+        default=0.6,
+        description="Minimum cosine similarity for reusing an answer"
+    )
+    similarity_capacity: int = Field(
+        default=1000,
+        description="Maximum number of questions kept in the similarity index"
+    )
+    similarity_curated_path: str | None = Field(
+        default=None,
+        description="JSONL file of operator-curated question/answer pairs"
+    )
+    similarity_learn_answers: bool = Field(
+        default=False,
+        description="Also reuse generated first-turn answers (by default only curated answers are reused)"
+    )
+
+    # Usage Accounting & Budgets
+    usage_max_tracked_users: int = Field(
+        default=100000,
+        description="Maximum number of conversations with tracked token usage"
+    )
+    daily_token_budget_per_user: int = Field(
+        default=0,
+        description="Tokens per conversation per 24h before switching to cheaper, shorter replies (0 = unlimited)"
+    )
+    daily_token_budget_global: int = Field(
+        default=0,
+        description="Tokens across all conversations per 24h before switching to cheaper, shorter replies (0 = unlimited)"
+    )
+
+    # Metrics Access
+    metrics_token: str | None = Field(
+        default=None,
+        description="Secret token required for the /metrics endpoints (unset disables them)"
+    )
+
+    # Profiling (debug)
+    profiling_enabled: bool = Field(
+        default=False,
+        description="Enable the sampling profiler endpoint and per-request profiling header"
+    )
+    profiling_token: str | None = Field(
+        default=None,
+        description="Secret token required to trigger profiling"
+    )
+    profiling_interval_ms: float = Field(
+        default=5.0,
+        description="Milliseconds between profiler samples"
+    )
+
+    # Event-Loop Monitoring
+    loop_monitor_enabled: bool = Field(
+        default=True,
+        description="Continuously measure event-loop lag"
+    )
+    loop_monitor_interval: float = Field(
+        default=0.1,
+        description="Seconds between event-loop lag measurements"
+    )
+    loop_blocking_threshold_ms: float = Field(
+        default=100.0,
+        description="Blocking duration that captures the offending stack (debug mode only)"
+    )
+
     def validate_ai_provider_key(self) -> None:
         """Validate that the required API key is present for the selected provider."""
-        if self.ai_provider == "groq" and not self.groq_api_key:
+        if self.ai_provider == "groq" and not (self.groq_api_key or self.groq_api_keys):
             raise ValueError("GROQ_API_KEY is required when AI_PROVIDER is 'groq'")
-        elif self.ai_provider == "openai" and not self.openai_api_key:
+        elif self.ai_provider == "openai" and not (self.openai_api_key or self.openai_api_keys):
             raise ValueError("OPENAI_API_KEY is required when AI_PROVIDER is 'openai'")
-        elif self.ai_provider == "claude" and not self.anthropic_api_key:
+        elif self.ai_provider == "claude" and not (self.anthropic_api_key or self.anthropic_api_keys):
             raise ValueError("ANTHROPIC_API_KEY is required when AI_PROVIDER is 'claude'")
 
 
@@ -3,12 +3,18 @@ WhatsApp AI Chatbot - Main FastAPI Application
 Multi-provider AI chatbot for WhatsApp Business API
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.config import settings
-from app.routers import webhook
+from app.routers import webhook, metrics
+from app.services.ai import ai_service
+from app.services.whatsapp import whatsapp_service
+from app.services.admission import admission_controller
+from app.services.profiler import SamplingProfiler, profiling_authorized
+from app.services.loop_monitor import loop_monitor
 
 # Configure logging
 logging.basicConfig(
@@ -28,10 +34,18 @@ async def lifespan(app: FastAPI):
     logger.info(f"Debug Mode: {settings.debug}")
     logger.info("=" * 60)
 
+    if settings.loop_monitor_enabled:
+        await loop_monitor.start()
+    await ai_service.start()
+
     yield
 
     # Shutdown
     logger.info("WhatsApp AI Chatbot shutting down...")
+    await loop_monitor.stop()
+    await admission_controller.close()
+    await ai_service.close()
+    await whatsapp_service.close()
 
 
 # Create FastAPI application
@@ -45,6 +59,7 @@ app = FastAPI(
 
 # Include routers
 app.include_router(webhook.router, tags=["webhook"])
+app.include_router(metrics.router, tags=["metrics"])
 
 
 @app.get("/")
@@ -60,12 +75,54 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {
-        "status": "healthy",
+    """
+    Health check endpoint.
+
+    Doubles as a readiness probe: returns 503 while load is being shed.
+    """
+    load = admission_controller.get_status()
+    shedding = load["level"] == "shedding"
+    content = {
+        "status": "overloaded" if shedding else ("degraded" if load["level"] != "normal" else "healthy"),
         "ai_provider": settings.ai_provider,
-        "debug": settings.debug
+        "debug": settings.debug,
+        "load": load
     }
+    if shedding:
+        return JSONResponse(status_code=503, content=content)
+    return content
+
+
+_profile_lock = asyncio.Lock()
+
+
+@app.get("/debug/profile", include_in_schema=False)
+async def profile(
+    seconds: float = Query(default=10.0, gt=0, le=60),
+    token: str | None = Header(default=None, alias="X-Debug-Token")
+):
+    """
+    Sample all threads for N seconds and return collapsed stacks.
+
+    Requires PROFILING_ENABLED and the X-Debug-Token header. The output can be
+    fed directly to flamegraph.pl or speedscope.
+    """
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not profiling_authorized(token):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    async with _profile_lock:
+        profiler = SamplingProfiler(interval=settings.profiling_interval_ms / 1000)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            collapsed = profiler.stop()
+
+    return PlainTextResponse(collapsed)
 
 
 @app.exception_handler(Exception)
@@ -1,5 +1,5 @@
 """
-Pydantic models for WhatsApp webhook messages.
+Pydantic models for WhatsApp webhook messages and AI provider results.
 """
 
 from typing import Any, Literal
@@ -50,8 +50,29 @@ class TextMessage(BaseModel):
     text: dict[str, str] = Field(description="Text message content")
 
 
+class TemplateMessage(BaseModel):
+    """Model for sending a template message via WhatsApp."""
+
+    messaging_product: Literal["whatsapp"] = "whatsapp"
+    recipient_type: Literal["individual"] = "individual"
+    to: str = Field(description="Recipient's phone number")
+    type: Literal["template"] = "template"
+    template: dict[str, Any] = Field(description="Template name, language and components")
+
+
 class ChatMessage(BaseModel):
     """Model for chat conversation messages."""
 
     role: Literal["user", "assistant", "system"] = Field(description="Message role")
     content: str = Field(description="Message content")
+
+
+class GenerationResult(BaseModel):
+    """Structured result of a provider call."""
+
+    text: str = Field(description="Generated response text")
+    input_tokens: int = Field(default=0, description="Prompt tokens, including cached tokens")
+    output_tokens: int = Field(default=0, description="Completion tokens")
+    cached_tokens: int = Field(default=0, description="Prompt tokens served from the provider's cache")
+    model: str = Field(description="Model that generated the response")
+    latency_ms: float = Field(default=0.0, description="Provider call duration in milliseconds")
@@ -0,0 +1,102 @@
+"""
+Metrics router exposing runtime analytics.
+All endpoints require the X-Debug-Token header (they expose phone numbers
+and operational details).
+"""
+
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from app.config import settings
+from app.services.delivery import delivery_tracker
+from app.services.ai import ai_service
+from app.services.usage import UsageTracker, usage_tracker
+from app.services.loop_monitor import loop_monitor
+from app.services.deadline import deadline_stats
+
+
+async def require_metrics_token(token: str | None = Header(default=None, alias="X-Debug-Token")) -> None:
+    """
+    Check the X-Debug-Token header against the configured metrics token.
+
+    Raises:
+        HTTPException: 404 if metrics are disabled (no token configured), 403 if the token is wrong
+    """
+    if not settings.metrics_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not secrets.compare_digest(token, settings.metrics_token):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+
+router = APIRouter(prefix="/metrics", dependencies=[Depends(require_metrics_token)])
+
+
+@router.get("/delivery")
+async def delivery_metrics():
+    """
+    Delivery-latency analytics from WhatsApp status callbacks.
+
+    Reports send→delivered and delivered→read latency percentiles (seconds)
+    and failure rates per error code.
+    """
+    return delivery_tracker.get_stats()
+
+
+@router.get("/similarity")
+async def similarity_metrics():
+    """Hit rate and size of the similar-question answer index."""
+    if ai_service.similarity_index is None:
+        raise HTTPException(status_code=404, detail="Similarity index is disabled")
+    return ai_service.similarity_index.get_stats()
+
+
+@router.get("/intents")
+async def intent_metrics():
+    """Hit rate, hits per intent and match time of the fast-path intent router."""
+    if ai_service.intent_router is None:
+        raise HTTPException(status_code=404, detail="Intent router is disabled")
+    return ai_service.intent_router.get_stats()
+
+
+@router.get("/usage")
+async def usage_metrics(top: int = Query(default=10, ge=1, le=UsageTracker.TOP_CANDIDATES)):
+    """
+    Token and cost accounting across all conversations.
+
+    Includes lifetime totals, last hour / last 24h windows and the heaviest
+    conversations of the last 24 hours.
+    """
+    return usage_tracker.get_stats(top=top)
+
+
+@router.get("/usage/{phone_number}")
+async def conversation_usage_metrics(phone_number: str):
+    """Token and cost accounting for a single conversation."""
+    stats = usage_tracker.get_user_stats(phone_number)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No usage recorded for this conversation")
+    return stats
+
+
+@router.get("/event-loop")
+async def event_loop_metrics():
+    """
+    Event-loop lag histogram and recent blocking calls.
+
+    Blocking calls (with stacks) are only captured in debug mode.
+    """
+    return loop_monitor.get_stats()
+
+
+@router.get("/keys")
+async def key_pool_metrics():
+    """Per-key utilisation, rate-limit headroom and cooldowns of the active provider."""
+    return {
+        "provider": ai_service.provider.get_provider_name(),
+        "keys": ai_service.provider.key_pool.get_stats()
+    }
+
+
+@router.get("/deadlines")
+async def deadline_metrics():
+    """Per-stage deadline misses (mark-read, provider, send) and fallback replies sent."""
+    return deadline_stats.get_stats()
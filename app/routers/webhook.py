@@ -7,6 +7,10 @@ from fastapi import APIRouter, Request, HTTPException, Query
 from app.config import settings
 from app.models.messages import WebhookPayload
 from app.services.whatsapp import whatsapp_service
+from app.services.delivery import delivery_tracker
+from app.services.admission import admission_controller
+from app.services.deadline import Deadline, DeadlineExceeded, deadline_stats
+from app.services.profiler import start_request_profiler
 from app.services.ai import ai_service
 
 logger = logging.getLogger(__name__)
@@ -40,8 +44,10 @@ async def receive_webhook(request: Request):
     """
     Receive webhook events from WhatsApp Business API.
 
-    Processes incoming messages and sends AI-generated responses.
+    Processes incoming messages and sends AI-generated responses. All
+    messages of the request share one deadline, started when it arrived.
     """
+    deadline = Deadline(settings.message_deadline)
     try:
         # Parse webhook payload
         body = await request.json()
@@ -54,21 +60,32 @@ async def receive_webhook(request: Request):
             logger.warning(f"Invalid webhook payload: {str(e)}")
             return {"status": "ignored"}
 
-        # Process each entry
-        for entry in payload.entry:
-            for change in entry.changes:
-                value = change.get("value", {})
-
-                # Check if there are messages
-                messages = value.get("messages")
-                if not messages:
-                    logger.debug("No messages in webhook")
-                    continue
-
-                # Process each message
-                for message in messages:
-                    await process_message(message)
+        # Optionally profile this request (X-Profile header carries the debug token)
+        profiler = start_request_profiler(request.headers.get("x-profile"))
 
+        # Process each entry
+        try:
+            for entry in payload.entry:
+                for change in entry.changes:
+                    value = change.get("value", {})
+
+                    # Record delivery status updates for our outbound messages
+                    for status in value.get("statuses") or []:
+                        delivery_tracker.record_status(status)
+
+                    # Check if there are messages
+                    messages = value.get("messages")
+                    if not messages:
+                        logger.debug("No messages in webhook")
+                        continue
+
+                    for message in messages:
+                        await process_message(message, deadline)
+        finally:
+            profile = profiler.stop() if profiler else None
+
+        if profile is not None:
+            return {"status": "ok", "profile": profile}
         return {"status": "ok"}
 
     except Exception as e:
@@ -77,12 +94,13 @@ async def receive_webhook(request: Request):
         return {"status": "error", "message": str(e)}
 
 
-async def process_message(message: dict):
+async def process_message(message: dict, deadline: Deadline):
     """
     Process a single incoming message.
 
     Args:
         message: Message object from webhook
+        deadline: Time budget for replying, started when the message arrived
     """
     try:
         # Extract message details
@@ -103,31 +121,107 @@ async def process_message(message: dict):
 
         logger.info(f"Processing message from {from_number}: {text_body}")
 
-        # Mark message as read
-        await whatsapp_service.mark_message_as_read(message_id)
-
-        # Generate AI response
-        ai_response = await ai_service.process_message(
-            phone_number=from_number,
-            user_message=text_body
-        )
+        # Mark message as read (not critical, so it only gets a short slice of the budget)
+        try:
+            async with deadline.stage("mark_read", cap=settings.mark_read_timeout):
+                await whatsapp_service.mark_message_as_read(message_id)
+        except DeadlineExceeded:
+            pass
 
-        # Send response back to user
-        await whatsapp_service.send_text_message(
-            to=from_number,
-            message=ai_response
-        )
+        # Commands and menu picks are answered right away, without the LLM (never shed)
+        routed = ai_service.route_intent(from_number, text_body)
+        if routed is not None:
+            _, intent_reply = routed
+            async with deadline.stage("send"):
+                send_result = await whatsapp_service.send_text_message(
+                    to=from_number,
+                    message=intent_reply
+                )
+            delivery_tracker.track_sent(send_result)
+            return
 
-        logger.info(f"Response sent to {from_number}")
+        # Shed load: acknowledge now and answer once capacity frees up
+        if admission_controller.level() >= admission_controller.SHEDDING:
+            # The deferred reply starts its own deadline once it runs
+            if admission_controller.defer(reply_to_message(from_number, text_body)):
+                logger.warning(f"Overloaded - deferring reply to {from_number}")
+                async with deadline.stage("send"):
+                    await whatsapp_service.send_text_message(
+                        to=from_number,
+                        message=settings.busy_message
+                    )
+                return
+            logger.warning("Deferred queue full - processing reply inline")
+
+        await reply_to_message(from_number, text_body, deadline)
+
+    except DeadlineExceeded as e:
+        logger.error(f"Error processing message: {str(e)}")
 
     except Exception as e:
         logger.error(f"Error processing message: {str(e)}")
-        # Try to send error message to user
+        await send_error_message(message.get("from"))
+
+
+async def reply_to_message(from_number: str, text_body: str, deadline: Deadline | None = None):
+    """
+    Generate an AI reply and send it to the user.
+
+    The provider stage (including the wait for an admission slot) keeps
+    send_reserve seconds of the deadline free, so a fallback reply can still
+    be sent promptly when the answer is not ready in time.
+
+    Args:
+        from_number: User's phone number
+        text_body: User's message text
+        deadline: Time budget for replying (a new one is started if not given)
+    """
+    deadline = deadline or Deadline(settings.message_deadline)
+    try:
+        # Generate AI response (degraded according to current load)
         try:
-            error_msg = "Sorry, I encountered an error. Please try again later."
-            await whatsapp_service.send_text_message(
-                to=message.get("from"),
-                message=error_msg
+            async with deadline.stage("provider", reserve=settings.send_reserve):
+                async with admission_controller.slot() as load_level:
+                    ai_response = await ai_service.process_message(
+                        phone_number=from_number,
+                        user_message=text_body,
+                        load_level=load_level
+                    )
+        except DeadlineExceeded:
+            logger.warning(f"No reply for {from_number} before the deadline - sending fallback")
+            deadline_stats.fallback_replies += 1
+            ai_response = settings.deadline_fallback_message
+
+        # Send response back to user
+        async with deadline.stage("send"):
+            send_result = await whatsapp_service.send_text_message(
+                to=from_number,
+                message=ai_response
             )
-        except:
-            pass
+        delivery_tracker.track_sent(send_result)
+
+        logger.info(f"Response sent to {from_number}")
+
+    except DeadlineExceeded as e:
+        logger.error(f"Error replying to message: {str(e)}")
+
+    except Exception as e:
+        logger.error(f"Error replying to message: {str(e)}")
+        await send_error_message(from_number)
+
+
+async def send_error_message(to: str):
+    """
+    Try to send a generic error message to the user.
+
+    Args:
+        to: User's phone number
+    """
+    try:
+        error_msg = "Sorry, I encountered an error. Please try again later."
+        await whatsapp_service.send_text_message(
+            to=to,
+            message=error_msg
+        )
+    except:
+        pass
@@ -0,0 +1,196 @@
+"""
+Admission control and graceful degradation under overload.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Coroutine
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """
+    Tracks load on the reply pipeline and decides how much to degrade.
+
+    Pressure is the highest of three ratios: in-flight requests against the
+    concurrency limit, recent queue wait against its target, and recent
+    provider latency against its target. Recent values are exponentially
+    weighted and decay while idle, so the level recovers once load drops.
+    """
+
+    NORMAL = 0
+    REDUCED_TOKENS = 1
+    TRIMMED_HISTORY = 2
+    CHEAPER_MODEL = 3
+    SHEDDING = 4
+
+    LEVEL_NAMES = ["normal", "reduced_tokens", "trimmed_history", "cheaper_model", "shedding"]
+
+    # Pressure at which each level (1..4) kicks in
+    LEVEL_THRESHOLDS = [0.6, 0.75, 0.9, 1.0]
+
+    EWMA_ALPHA = 0.2
+    DECAY_HALF_LIFE = 30.0
+
+    def __init__(
+        self,
+        max_in_flight: int = 50,
+        target_queue_wait: float = 2.0,
+        target_latency: float = 10.0,
+        max_deferred: int = 1000
+    ):
+        """
+        Initialize admission controller.
+
+        Args:
+            max_in_flight: Maximum number of replies processed concurrently
+            target_queue_wait: Queue wait (seconds) considered full pressure
+            target_latency: Provider latency (seconds) considered full pressure
+            max_deferred: Maximum number of replies deferred while shedding
+        """
+        self.max_in_flight = max_in_flight
+        self.target_queue_wait = target_queue_wait
+        self.target_latency = target_latency
+        self.max_deferred = max_deferred
+        self.in_flight = 0
+        self.shed_count = 0
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._queue_wait = 0.0
+        self._queue_wait_updated = time.monotonic()
+        self._latency = 0.0
+        self._latency_updated = time.monotonic()
+        self._deferred: set[asyncio.Task] = set()
+        logger.info(f"Admission controller initialized (max in-flight: {max_in_flight})")
+
+    def _decayed(self, value: float, updated_at: float) -> float:
+        """Decay a recent value towards zero based on time since its last update."""
+        idle = time.monotonic() - updated_at
+        return value * 0.5 ** (idle / self.DECAY_HALF_LIFE)
+
+    def _update(self, current: float, updated_at: float, sample: float) -> float:
+        """Blend a new sample into a decayed exponentially weighted average."""
+        current = self._decayed(current, updated_at)
+        return current + self.EWMA_ALPHA * (sample - current)
+
+    def record_queue_wait(self, seconds: float) -> None:
+        """Record how long a request waited for a processing slot."""
+        self._queue_wait = self._update(self._queue_wait, self._queue_wait_updated, seconds)
+        self._queue_wait_updated = time.monotonic()
+
+    def record_latency(self, seconds: float) -> None:
+        """Record the duration of a provider call."""
+        self._latency = self._update(self._latency, self._latency_updated, seconds)
+        self._latency_updated = time.monotonic()
+
+    def pressure(self) -> float:
+        """
+        Get the current load pressure.
+
+        Returns:
+            Pressure where 1.0 means at least one signal is at its limit
+        """
+        return max(
+            self.in_flight / self.max_in_flight,
+            self._decayed(self._queue_wait, self._queue_wait_updated) / self.target_queue_wait,
+            self._decayed(self._latency, self._latency_updated) / self.target_latency
+        )
+
+    def level(self) -> int:
+        """
+        Get the current degradation level.
+
+        Returns:
+            One of NORMAL, REDUCED_TOKENS, TRIMMED_HISTORY, CHEAPER_MODEL or SHEDDING
+        """
+        pressure = self.pressure()
+        level = self.NORMAL
+        for threshold in self.LEVEL_THRESHOLDS:
+            if pressure >= threshold:
+                level += 1
+        return level
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[int]:
+        """
+        Hold a processing slot for the duration of a reply.
+
+        Yields:
+            Degradation level to apply to this reply (never SHEDDING)
+        """
+        self.in_flight += 1
+        start = time.monotonic()
+        try:
+            async with self._semaphore:
+                self.record_queue_wait(time.monotonic() - start)
+                yield min(self.level(), self.CHEAPER_MODEL)
+        finally:
+            self.in_flight -= 1
+
+    def defer(self, work: Coroutine) -> bool:
+        """
+        Run work in the background once pressure drops below the shedding level.
+
+        Args:
+            work: Coroutine to run later
+
+        Returns:
+            True if deferred, False if the deferred queue is full
+        """
+        self.shed_count += 1
+        if len(self._deferred) >= self.max_deferred:
+            work.close()
+            return False
+
+        task = asyncio.create_task(self._run_deferred(work))
+        self._deferred.add(task)
+        task.add_done_callback(self._deferred.discard)
+        return True
+
+    async def _run_deferred(self, work: Coroutine) -> None:
+        """Wait until the pipeline is admitting again, then run the deferred work."""
+        try:
+            while self.level() >= self.SHEDDING:
+                await asyncio.sleep(1.0)
+            await work
+        except asyncio.CancelledError:
+            work.close()
+            raise
+        except Exception as e:
+            logger.error(f"Deferred work failed: {str(e)}")
+
+    async def close(self) -> None:
+        """Cancel deferred work that has not started yet."""
+        for task in list(self._deferred):
+            task.cancel()
+        await asyncio.gather(*self._deferred, return_exceptions=True)
+
+    def get_status(self) -> dict:
+        """
+        Get the current admission state.
+
+        Returns:
+            Dict with the degradation level and the signals behind it
+        """
+        return {
+            "level": self.LEVEL_NAMES[self.level()],
+            "pressure": round(self.pressure(), 3),
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_wait_seconds": round(self._decayed(self._queue_wait, self._queue_wait_updated), 3),
+            "provider_latency_seconds": round(self._decayed(self._latency, self._latency_updated), 3),
+            "deferred": len(self._deferred),
+            "shed_total": self.shed_count
+        }
+
+
+# Global admission controller instance
+admission_controller = AdmissionController(
+    max_in_flight=settings.admission_max_in_flight,
+    target_queue_wait=settings.admission_target_queue_wait,
+    target_latency=settings.admission_target_latency,
+    max_deferred=settings.admission_max_deferred
+)
@@ -2,14 +2,21 @@
 AI Service module with provider factory and session management.
 """
 
+import asyncio
 import logging
-from typing import Literal
+import time
+from collections import deque
+from typing import Literal, Sequence
 from app.config import settings
-from app.services.ai.base import AIProvider
+from app.services.ai.base import AIProvider, ChatMessage, GenerationResult
 from app.services.ai.groq import GroqProvider
 from app.services.ai.openai import OpenAIProvider
 from app.services.ai.claude import ClaudeProvider
-from app.models.messages import ChatMessage
+from app.services.ai.key_pool import parse_key_pool
+from app.services.admission import AdmissionController, admission_controller
+from app.services.intents import Intent, IntentRouter
+from app.services.similarity import SimilarityIndex
+from app.services.usage import usage_tracker
 
 logger = logging.getLogger(__name__)
 
@@ -19,13 +26,15 @@ class AIProviderFactory:
 
     @staticmethod
     def create_provider(
-        provider_type: Literal["groq", "openai", "claude"]
+        provider_type: Literal["groq", "openai", "claude"],
+        base_url: str | None = None
     ) -> AIProvider:
         """
         Create an AI provider instance based on the provider type.
 
         Args:
             provider_type: Type of AI provider to create
+            base_url: Optional API base URL override (e.g. a local fake server)
 
         Returns:
             AIProvider instance
@@ -34,27 +43,47 @@ class AIProviderFactory:
             ValueError: If provider type is invalid or API key is missing
         """
         if provider_type == "groq":
-            if not settings.groq_api_key:
+            keys = parse_key_pool(settings.groq_api_key, settings.groq_api_keys)
+            if not keys:
                 raise ValueError("GROQ_API_KEY is not configured")
-            return GroqProvider(api_key=settings.groq_api_key)
+            return GroqProvider(keys=keys, base_url=base_url)
 
         elif provider_type == "openai":
-            if not settings.openai_api_key:
+            keys = parse_key_pool(settings.openai_api_key, settings.openai_api_keys)
+            if not keys:
                 raise ValueError("OPENAI_API_KEY is not configured")
-            return OpenAIProvider(api_key=settings.openai_api_key)
+            return OpenAIProvider(keys=keys, base_url=base_url)
 
         elif provider_type == "claude":
-            if not settings.anthropic_api_key:
+            keys = parse_key_pool(settings.anthropic_api_key, settings.anthropic_api_keys)
+            if not keys:
                 raise ValueError("ANTHROPIC_API_KEY is not configured")
-            return ClaudeProvider(api_key=settings.anthropic_api_key)
+            return ClaudeProvider(keys=keys, base_url=base_url)
 
         else:
             raise ValueError(f"Unknown AI provider: {provider_type}")
 
 
+class Conversation:
+    """
+    Conversation history kept in provider-native form.
+
+    Messages are stored as the exact dicts sent to the provider SDKs, so building
+    a request payload never converts or copies individual messages. The bounded
+    deque appends new turns and drops the oldest ones in O(1).
+    """
+
+    __slots__ = ("messages",)
+
+    def __init__(self, max_history: int):
+        self.messages: deque[ChatMessage] = deque(maxlen=max_history)
+
+
 class ConversationManager:
     """Manages conversation history for different phone numbers (in-memory)."""
 
+    ROLES = ("user", "assistant")
+
     def __init__(self, max_history: int = 10):
         """
         Initialize conversation manager.
@@ -62,7 +91,7 @@ class ConversationManager:
         Args:
             max_history: Maximum number of messages to keep per conversation
         """
-        self.conversations: dict[str, list[ChatMessage]] = {}
+        self.conversations: dict[str, Conversation] = {}
         self.max_history = max_history
         logger.info(f"Conversation manager initialized (max history: {max_history})")
 
@@ -74,21 +103,23 @@ class ConversationManager:
             phone_number: User's phone number (conversation ID)
             role: Message role (user/assistant)
             content: Message content
+
+        Raises:
+            ValueError: If the role is not user or assistant
         """
-        if phone_number not in self.conversations:
-            self.conversations[phone_number] = []
+        if role not in self.ROLES:
+            raise ValueError(f"Invalid message role: {role}")
 
-        # Create message
-        message = ChatMessage(role=role, content=content)
-        self.conversations[phone_number].append(message)
+        conversation = self.conversations.get(phone_number)
+        if conversation is None:
+            conversation = self.conversations[phone_number] = Conversation(self.max_history)
 
-        # Trim history if needed (keep only last N messages)
-        if len(self.conversations[phone_number]) > self.max_history:
-            self.conversations[phone_number] = self.conversations[phone_number][-self.max_history:]
+        # Oldest messages fall off the front once max_history is reached
+        conversation.messages.append({"role": role, "content": content})
 
-        logger.debug(f"Added {role} message for {phone_number} (history: {len(self.conversations[phone_number])})")
+        logger.debug(f"Added {role} message for {phone_number} (history: {len(conversation.messages)})")
 
-    def get_history(self, phone_number: str) -> list[ChatMessage]:
+    def get_history(self, phone_number: str) -> Sequence[ChatMessage]:
         """
         Get conversation history for a phone number.
 
@@ -96,9 +127,10 @@ class ConversationManager:
             phone_number: User's phone number
 
         Returns:
-            List of chat messages (empty list if no history)
+            Provider-native chat messages, oldest first (empty if no history)
         """
-        return self.conversations.get(phone_number, [])
+        conversation = self.conversations.get(phone_number)
+        return conversation.messages if conversation else ()
 
     def clear_history(self, phone_number: str) -> None:
         """
@@ -115,39 +147,202 @@ class ConversationManager:
 class AIService:
     """Main AI service that coordinates provider and conversation management."""
 
-    def __init__(self):
-        """Initialize AI service with configured provider."""
-        self.provider = AIProviderFactory.create_provider(settings.ai_provider)
+    def __init__(self, provider: AIProvider | None = None):
+        """
+        Initialize AI service.
+
+        Args:
+            provider: Optional provider instance (defaults to the configured provider)
+        """
+        self.provider = provider or AIProviderFactory.create_provider(settings.ai_provider)
         self.conversation_manager = ConversationManager()
+        self.similarity_index = self._create_similarity_index() if settings.similarity_index_enabled else None
+        self.intent_router = self._create_intent_router() if settings.intents_enabled else None
+        self._last_activity = time.monotonic()
+        self._keepalive_task: asyncio.Task | None = None
         logger.info(f"AI Service initialized with provider: {self.provider.get_provider_name()}")
 
-    async def process_message(self, phone_number: str, user_message: str) -> str:
+    @staticmethod
+    def _create_similarity_index() -> SimilarityIndex:
+        """Create the similar-question index and load curated answers."""
+        index = SimilarityIndex(
+            capacity=settings.similarity_capacity,
+            threshold=settings.similarity_threshold
+        )
+        if settings.similarity_curated_path:
+            index.load_curated(settings.similarity_curated_path)
+        return index
+
+    @staticmethod
+    def _create_intent_router() -> IntentRouter:
+        """Create the intent router with the built-in and custom intents."""
+        router = IntentRouter()
+        if settings.intents_path:
+            router.load(settings.intents_path)
+        return router
+
+    async def start(self) -> None:
+        """Pre-warm provider connections and start the idle keep-alive task."""
+        if settings.provider_warmup_enabled:
+            elapsed_ms = await self.provider.warm_up()
+            if elapsed_ms is not None:
+                logger.info(f"{self.provider.get_provider_name()} connection warmed up in {elapsed_ms:.1f} ms")
+
+        if settings.provider_keepalive_interval > 0:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+    async def close(self) -> None:
+        """Stop the keep-alive task and close the provider client."""
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            try:
+                await self._keepalive_task
+            except asyncio.CancelledError:
+                pass
+            self._keepalive_task = None
+
+        await self.provider.aclose()
+        logger.info("AI provider client closed")
+
+    async def _keepalive_loop(self) -> None:
+        """Ping the provider whenever it has been idle for a full keep-alive interval."""
+        interval = settings.provider_keepalive_interval
+        while True:
+            await asyncio.sleep(interval)
+            if time.monotonic() - self._last_activity >= interval:
+                elapsed_ms = await self.provider.warm_up()
+                if elapsed_ms is not None:
+                    logger.debug(f"Provider keep-alive ping took {elapsed_ms:.1f} ms")
+
+    def _degradation_options(self, load_level: int) -> tuple[int | None, int | None, str | None]:
         """
-        Process a user message and generate a response.
+        Map an admission load level to provider overrides.
+
+        Levels are cumulative: each level keeps the degradations of the ones below it.
+
+        Args:
+            load_level: Degradation level from the admission controller
+
+        Returns:
+            Tuple of (max_tokens, max_history, model) overrides (None = default)
+        """
+        max_tokens = max_history = model = None
+        if load_level >= AdmissionController.REDUCED_TOKENS:
+            max_tokens = settings.degraded_max_tokens
+        if load_level >= AdmissionController.TRIMMED_HISTORY:
+            max_history = settings.degraded_max_history
+        if load_level >= AdmissionController.CHEAPER_MODEL:
+            model = settings.degraded_model or self.provider.fallback_model
+        return max_tokens, max_history, model
+
+    async def generate_reply(self, phone_number: str, user_message: str, load_level: int = 0) -> GenerationResult:
+        """
+        Generate a response and update the conversation history.
 
         Args:
             phone_number: User's phone number (used for conversation tracking)
             user_message: The user's message text
+            load_level: Degradation level from the admission controller
 
         Returns:
-            AI-generated response text
+            Generation result with response text and usage
+
+        Raises:
+            Exception: If the provider call fails
         """
+        self._last_activity = time.monotonic()
+
+        # Get conversation history
+        history = self.conversation_manager.get_history(phone_number)
+        first_turn = not history
+
+        # Reuse the answer of a near-duplicate first-turn question
+        if first_turn and self.similarity_index:
+            cached = self.similarity_index.lookup(user_message)
+            if cached is not None:
+                logger.info(f"Similar question answered from index for {phone_number}")
+                self.conversation_manager.add_message(phone_number, "user", user_message)
+                self.conversation_manager.add_message(phone_number, "assistant", cached)
+                return GenerationResult(text=cached, model="similarity-index")
+
+        # Heavy users past their token budget get the cheaper, shorter-reply path
+        if usage_tracker.over_budget(phone_number):
+            logger.info(f"Token budget exceeded for {phone_number} - using cheaper model")
+            load_level = max(load_level, AdmissionController.CHEAPER_MODEL)
+
+        # Degrade gracefully under load
+        max_tokens, max_history, model = self._degradation_options(load_level)
+        if max_history is not None:
+            history = list(history)[-max_history:] if max_history > 0 else []
+
+        # Generate response
+        logger.info(f"Processing message from {phone_number}: {user_message[:50]}...")
+        start = time.monotonic()
         try:
-            # Get conversation history
-            history = self.conversation_manager.get_history(phone_number)
-
-            # Generate response
-            logger.info(f"Processing message from {phone_number}: {user_message[:50]}...")
-            response = await self.provider.generate_response(
+            result = await self.provider.generate_response(
                 user_message=user_message,
-                conversation_history=history
+                conversation_history=history,
+                max_tokens=max_tokens,
+                model=model
             )
+        finally:
+            admission_controller.record_latency(time.monotonic() - start)
 
-            # Update conversation history
-            self.conversation_manager.add_message(phone_number, "user", user_message)
-            self.conversation_manager.add_message(phone_number, "assistant", response)
+        usage_tracker.record(phone_number, result)
 
-            return response
+        # Update conversation history
+        self.conversation_manager.add_message(phone_number, "user", user_message)
+        self.conversation_manager.add_message(phone_number, "assistant", result.text)
+
+        # Optionally remember full-quality first-turn answers for similar questions
+        if (
+            first_turn and self.similarity_index and settings.similarity_learn_answers
+            and load_level == AdmissionController.NORMAL
+        ):
+            self.similarity_index.add(user_message, result.text)
+
+        return result
+
+    def route_intent(self, phone_number: str, user_message: str) -> tuple[Intent, str] | None:
+        """
+        Answer commands and menu picks without the LLM.
+
+        Args:
+            phone_number: User's phone number
+            user_message: The user's message text
+
+        Returns:
+            Tuple of (matched intent, reply text), or None if no intent matches (the message goes to the LLM)
+        """
+        if self.intent_router is None:
+            return None
+
+        match = self.intent_router.match(user_message)
+        if match is None:
+            return None
+
+        intent, variables = match
+        if intent.action == "clear_history":
+            self.conversation_manager.clear_history(phone_number)
+
+        logger.info(f"Intent '{intent.name}' matched for {phone_number}")
+        return intent, self.intent_router.render(intent, {"phone_number": phone_number, **variables})
+
+    async def process_message(self, phone_number: str, user_message: str, load_level: int = 0) -> str:
+        """
+        Process a user message and generate a response.
+
+        Args:
+            phone_number: User's phone number (used for conversation tracking)
+            user_message: The user's message text
+            load_level: Degradation level from the admission controller
+
+        Returns:
+            AI-generated response text (a generic apology if generation fails)
+        """
+        try:
+            result = await self.generate_reply(phone_number, user_message, load_level)
+            return result.text
 
         except Exception as e:
             logger.error(f"Error processing message: {str(e)}")
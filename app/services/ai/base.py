@@ -3,12 +3,21 @@ Abstract base class for AI providers.
 All AI providers must implement this interface.
 """
 
+import asyncio
+import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Protocol
+from typing import Any, Sequence, TypedDict
+import httpx
+from app.config import settings
+from app.models.messages import GenerationResult
+from app.services.ai.key_pool import PROBE_EXTENSION, KeyPool, ProviderKey
 
+logger = logging.getLogger(__name__)
 
-class ChatMessage(Protocol):
-    """Protocol for chat messages."""
+
+class ChatMessage(TypedDict):
+    """Provider-native chat message (accepted as-is by all provider SDKs)."""
     role: str
     content: str
 
@@ -28,21 +37,93 @@ Key behaviors:
 
 You are here to assist with general questions and conversations."""
 
+    # Built once and shared by every request payload
+    SYSTEM_MESSAGE: ChatMessage = {"role": "system", "content": SYSTEM_PROMPT}
+
+    key_pool: KeyPool
+    model: str
+    fallback_model: str
+    max_tokens: int = 1024
+
+    def _init_key_pool(
+        self,
+        api_key: str | None,
+        base_url: str | None,
+        keys: list[ProviderKey] | None
+    ) -> None:
+        """
+        Create the provider's key pool (one SDK client per key).
+
+        Args:
+            api_key: Single API key (used when keys is not given)
+            base_url: Optional base URL override applied to every key
+            keys: Optional list of pooled keys
+        """
+        keys = keys or [ProviderKey(api_key=api_key)]
+        if base_url:
+            keys = [key.model_copy(update={"base_url": base_url}) for key in keys]
+        self.key_pool = KeyPool(
+            self.get_provider_name(),
+            keys,
+            self._create_client,
+            cooldown_seconds=settings.key_cooldown_seconds,
+            failure_threshold=settings.key_failure_threshold
+        )
+
+    @abstractmethod
+    def _create_client(self, key: ProviderKey, http_client: httpx.AsyncClient) -> Any:
+        """
+        Create an SDK client for one pooled key.
+
+        Args:
+            key: API key and its endpoint settings
+            http_client: Pooled HTTP client the SDK should use
+
+        Returns:
+            Provider SDK client
+        """
+        pass
+
+    def build_messages(
+        self,
+        user_message: str,
+        conversation_history: Sequence[ChatMessage] | None = None
+    ) -> list[ChatMessage]:
+        """
+        Build the request's messages array (history is already in provider-native form).
+
+        Args:
+            user_message: The user's message text
+            conversation_history: Optional previous user/assistant messages
+
+        Returns:
+            Messages array: system prompt, history, then the user's message
+        """
+        return [
+            self.SYSTEM_MESSAGE,
+            *(conversation_history or ()),
+            {"role": "user", "content": user_message}
+        ]
+
     @abstractmethod
     async def generate_response(
         self,
         user_message: str,
-        conversation_history: list[ChatMessage] | None = None
-    ) -> str:
+        conversation_history: Sequence[ChatMessage] | None = None,
+        max_tokens: int | None = None,
+        model: str | None = None
+    ) -> GenerationResult:
         """
         Generate a response to the user's message.
 
         Args:
             user_message: The user's message text
-            conversation_history: Optional list of previous messages in the conversation
+            conversation_history: Optional previous user/assistant messages in provider-native form
+            max_tokens: Optional override of the reply token limit
+            model: Optional override of the model
 
         Returns:
-            The AI-generated response text
+            Generation result with response text, token usage, model and latency
 
         Raises:
             Exception: If the API call fails
@@ -58,3 +139,35 @@ You are here to assist with general questions and conversations."""
             Provider name (e.g., "Groq", "OpenAI", "Claude")
         """
         pass
+
+    async def warm_up(self) -> float | None:
+        """
+        Open (or refresh) a pooled connection to the provider API for every key.
+
+        Sends a lightweight HEAD request so DNS resolution and the TLS handshake
+        happen before the first user message instead of during it. The request
+        is unauthenticated, so it is marked as a probe and its 401/403 reply
+        doesn't cool the key down.
+
+        Returns:
+            Elapsed time in milliseconds, or None if the provider was unreachable
+        """
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                key.http_client.head(str(key.client.base_url), extensions={PROBE_EXTENSION: True})
+                for key in self.key_pool.keys
+            ),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            logger.warning(f"{self.get_provider_name()} warm-up failed: {str(error)}")
+        if len(errors) == len(results):
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    async def aclose(self) -> None:
+        """Close the provider clients and their pooled connections."""
+        for key in self.key_pool.keys:
+            await key.client.close()
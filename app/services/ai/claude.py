@@ -4,8 +4,12 @@ Uses Anthropic's Claude models (paid service).
 """
 
 import logging
+import time
+from typing import Sequence
+import httpx
 from anthropic import AsyncAnthropic
-from app.services.ai.base import AIProvider, ChatMessage
+from app.services.ai.base import AIProvider, ChatMessage, GenerationResult
+from app.services.ai.key_pool import ProviderKey
 
 logger = logging.getLogger(__name__)
 
@@ -13,51 +17,83 @@ logger = logging.getLogger(__name__)
 class ClaudeProvider(AIProvider):
     """Anthropic Claude provider."""
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        keys: list[ProviderKey] | None = None
+    ):
         """
         Initialize Claude provider.
 
         Args:
             api_key: Anthropic API key from console.anthropic.com
+            base_url: Optional API base URL override (e.g. a local fake server)
+            keys: Optional pool of API keys (used instead of api_key)
         """
-        self.client = AsyncAnthropic(api_key=api_key)
+        self._init_key_pool(api_key, base_url, keys)
         self.model = "claude-3-5-sonnet-20241022"  # Latest Sonnet model
+        self.fallback_model = "claude-3-5-haiku-20241022"  # Cheaper model used under load
         logger.info(f"Initialized Claude provider with model: {self.model}")
 
+    def _create_client(self, key: ProviderKey, http_client: httpx.AsyncClient) -> AsyncAnthropic:
+        """Create a Claude SDK client for one pooled key."""
+        return AsyncAnthropic(
+            api_key=key.api_key,
+            base_url=key.base_url,
+            http_client=http_client,
+            max_retries=0  # Retries are handled by the key pool
+        )
+
+    def build_messages(
+        self,
+        user_message: str,
+        conversation_history: Sequence[ChatMessage] | None = None
+    ) -> list[ChatMessage]:
+        """Build the messages array (Claude takes the system prompt as a separate parameter)."""
+        return [
+            *(conversation_history or ()),
+            {"role": "user", "content": user_message}
+        ]
+
     async def generate_response(
         self,
         user_message: str,
-        conversation_history: list[ChatMessage] | None = None
-    ) -> str:
+        conversation_history: Sequence[ChatMessage] | None = None,
+        max_tokens: int | None = None,
+        model: str | None = None
+    ) -> GenerationResult:
         """Generate a response using Claude."""
         try:
-            # Build messages array (Claude doesn't include system in messages)
-            messages = []
-
-            # Add conversation history if provided
-            if conversation_history:
-                for msg in conversation_history:
-                    # Skip system messages in history (Claude handles system separately)
-                    if msg.role != "system":
-                        messages.append({"role": msg.role, "content": msg.content})
-
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
+            messages = self.build_messages(user_message, conversation_history)
 
             # Call Claude API (system prompt is separate parameter)
             logger.debug(f"Calling Claude API with {len(messages)} messages")
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=1024,
+            start = time.perf_counter()
+            response = await self.key_pool.run(lambda client: client.messages.create(
+                model=model or self.model,
+                max_tokens=max_tokens or self.max_tokens,
                 system=self.SYSTEM_PROMPT,
                 messages=messages,
                 temperature=0.7
-            )
+            ))
 
             # Extract response text
             response_text = response.content[0].text
             logger.info(f"Claude response generated: {len(response_text)} characters")
-            return response_text
+
+            # Claude reports cache reads/writes separately from uncached input tokens
+            usage = response.usage
+            cached_tokens = usage.cache_read_input_tokens or 0
+            cache_write_tokens = usage.cache_creation_input_tokens or 0
+            return GenerationResult(
+                text=response_text,
+                input_tokens=usage.input_tokens + cached_tokens + cache_write_tokens,
+                output_tokens=usage.output_tokens,
+                cached_tokens=cached_tokens,
+                model=response.model,
+                latency_ms=(time.perf_counter() - start) * 1000
+            )
 
         except Exception as e:
             logger.error(f"Claude API error: {str(e)}")
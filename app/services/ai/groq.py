@@ -4,8 +4,12 @@ Uses Groq's API with Llama models (free tier available).
 """
 
 import logging
+import time
+from typing import Sequence
+import httpx
 from groq import AsyncGroq
-from app.services.ai.base import AIProvider, ChatMessage
+from app.services.ai.base import AIProvider, ChatMessage, GenerationResult
+from app.services.ai.key_pool import ProviderKey
 
 logger = logging.getLogger(__name__)
 
@@ -13,50 +17,68 @@ logger = logging.getLogger(__name__)
 class GroqProvider(AIProvider):
     """Groq AI provider using Llama models."""
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        keys: list[ProviderKey] | None = None
+    ):
         """
         Initialize Groq provider.
 
         Args:
             api_key: Groq API key from console.groq.com
+            base_url: Optional API base URL override (e.g. a local fake server)
+            keys: Optional pool of API keys (used instead of api_key)
         """
-        self.client = AsyncGroq(api_key=api_key)
+        self._init_key_pool(api_key, base_url, keys)
         self.model = "llama-3.3-70b-versatile"  # Fast and capable model
+        self.fallback_model = "llama-3.1-8b-instant"  # Smaller, faster model used under load
         logger.info(f"Initialized Groq provider with model: {self.model}")
 
+    def _create_client(self, key: ProviderKey, http_client: httpx.AsyncClient) -> AsyncGroq:
+        """Create a Groq SDK client for one pooled key."""
+        return AsyncGroq(
+            api_key=key.api_key,
+            base_url=key.base_url,
+            http_client=http_client,
+            max_retries=0  # Retries are handled by the key pool
+        )
+
     async def generate_response(
         self,
         user_message: str,
-        conversation_history: list[ChatMessage] | None = None
-    ) -> str:
+        conversation_history: Sequence[ChatMessage] | None = None,
+        max_tokens: int | None = None,
+        model: str | None = None
+    ) -> GenerationResult:
         """Generate a response using Groq's Llama model."""
         try:
-            # Build messages array
-            messages = [{"role": "system", "content": self.SYSTEM_PROMPT}]
-
-            # Add conversation history if provided
-            if conversation_history:
-                for msg in conversation_history:
-                    messages.append({"role": msg.role, "content": msg.content})
-
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
+            messages = self.build_messages(user_message, conversation_history)
 
             # Call Groq API
             logger.debug(f"Calling Groq API with {len(messages)} messages")
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            start = time.perf_counter()
+            response = await self.key_pool.run(lambda client: client.chat.completions.create(
+                model=model or self.model,
                 messages=messages,
                 temperature=0.7,
-                max_tokens=1024,
+                max_tokens=max_tokens or self.max_tokens,
                 top_p=1,
                 stream=False
-            )
+            ))
 
             # Extract response text
             response_text = response.choices[0].message.content
             logger.info(f"Groq response generated: {len(response_text)} characters")
-            return response_text
+            usage = response.usage
+            return GenerationResult(
+                text=response_text,
+                input_tokens=usage.prompt_tokens if usage else 0,
+                output_tokens=usage.completion_tokens if usage else 0,
+                model=response.model,
+                latency_ms=(time.perf_counter() - start) * 1000
+            )
 
         except Exception as e:
             logger.error(f"Groq API error: {str(e)}")
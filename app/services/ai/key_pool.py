@@ -0,0 +1,337 @@
+"""
+API-key pool with headroom-based load balancing.
+Each key gets its own SDK client; requests go to the key with the most
+remaining rate-limit headroom, and exhausted or failing keys cool down.
+Retries happen here rather than inside the SDKs, so a rate-limited request
+moves to another key instead of sleeping on the exhausted one.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+import httpx
+from pydantic import BaseModel, Field
+from app.services.deadline import time_left
+from app.services.http import create_http_client
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# Same retry policy the provider SDKs use by default (2 retries, capped backoff)
+MAX_ATTEMPTS = 3
+MAX_BACKOFF_SECONDS = 8.0
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+AUTH_STATUS_CODES = frozenset({401, 403})
+MIN_ATTEMPT_SECONDS = 1.0  # Don't start a retry with less time than this before the deadline
+
+# Request extension marking traffic that is not an SDK call (warm-up and keep-alive
+# pings); its responses don't update rate limits or trigger cooldowns
+PROBE_EXTENSION = "key_pool_probe"
+
+T = TypeVar("T")
+
+
+class ProviderKey(BaseModel):
+    """One API key of a provider, with optional per-key endpoint settings."""
+
+    api_key: str = Field(description="Provider API key")
+    base_url: str | None = Field(default=None, description="Optional API base URL for this key")
+    organization: str | None = Field(default=None, description="Optional organization (OpenAI only)")
+
+
+def parse_key_pool(primary_key: str | None, extra_keys: str | None = None) -> list[ProviderKey]:
+    """
+    Build the key list of a provider from settings.
+
+    Extra keys are comma-separated; each entry is "key", "key|base_url" or
+    "key|base_url|organization" (leave base_url empty to keep the default).
+
+    Args:
+        primary_key: The provider's main API key
+        extra_keys: Additional comma-separated key entries
+
+    Returns:
+        List of provider keys (primary first, duplicates removed)
+    """
+    keys: list[ProviderKey] = []
+    entries = [primary_key] if primary_key else []
+    entries += [entry.strip() for entry in (extra_keys or "").split(",") if entry.strip()]
+
+    for entry in entries:
+        api_key, base_url, organization = (entry.split("|") + [None, None])[:3]
+        if any(key.api_key == api_key for key in keys):
+            continue
+        keys.append(ProviderKey(api_key=api_key, base_url=base_url or None, organization=organization or None))
+    return keys
+
+
+def _parse_reset(value: str | None) -> float | None:
+    """Parse a rate-limit reset header ("6m0s", "20ms", "1.5" or an RFC 3339 time) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts:
+        return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return max((reset_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except ValueError:
+        return None
+
+
+def _int_header(headers: httpx.Headers, *names: str) -> int | None:
+    """Read the first present integer header among several names."""
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return int(float(value))
+            except ValueError:
+                return None
+    return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Check whether an SDK error is transient (retryable status or connection failure)."""
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error.__cause__, httpx.TransportError)
+
+
+def _is_key_failure(error: Exception) -> bool:
+    """Check whether an SDK error says something about the key (transient failure or rejected key)."""
+    return _is_retryable(error) or getattr(error, "status_code", None) in AUTH_STATUS_CODES
+
+
+class PooledKey:
+    """Client and live rate-limit state of one API key."""
+
+    __slots__ = (
+        "label", "client", "http_client", "in_flight", "requests", "failures", "consecutive_failures",
+        "remaining_requests", "limit_requests", "remaining_tokens", "limit_tokens", "reset_at", "cooldown_until"
+    )
+
+    def __init__(self, label: str, client: Any, http_client: httpx.AsyncClient):
+        self.label = label
+        self.client = client
+        self.http_client = http_client
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.remaining_requests: int | None = None
+        self.limit_requests: int | None = None
+        self.remaining_tokens: int | None = None
+        self.limit_tokens: int | None = None
+        self.reset_at = 0.0
+        self.cooldown_until = 0.0
+
+    def headroom(self, now: float) -> float:
+        """Fraction of the rate limit still available, shared across in-flight requests."""
+        fractions = []
+        if now < self.reset_at:
+            if self.limit_requests and self.remaining_requests is not None:
+                fractions.append(self.remaining_requests / self.limit_requests)
+            if self.limit_tokens and self.remaining_tokens is not None:
+                fractions.append(self.remaining_tokens / self.limit_tokens)
+        return (min(fractions) if fractions else 1.0) / (1 + self.in_flight)
+
+
+class KeyPool:
+    """Balances requests across the API keys of one provider."""
+
+    def __init__(
+        self,
+        provider_name: str,
+        keys: list[ProviderKey],
+        create_client: Callable[[ProviderKey, httpx.AsyncClient], Any],
+        cooldown_seconds: float = 30.0,
+        failure_threshold: int = 3
+    ):
+        """
+        Initialize key pool.
+
+        Args:
+            provider_name: Provider name used in logs
+            keys: API keys to pool (at least one)
+            create_client: Builds an SDK client for a key on a given HTTP client
+            cooldown_seconds: Default time a failing or exhausted key is taken out
+            failure_threshold: Consecutive failures that trigger a cooldown
+
+        Raises:
+            ValueError: If no keys are given
+        """
+        if not keys:
+            raise ValueError(f"No API keys configured for {provider_name}")
+
+        self.provider_name = provider_name
+        self.cooldown_seconds = cooldown_seconds
+        self.failure_threshold = failure_threshold
+        self.keys: list[PooledKey] = []
+        for key in keys:
+            http_client = create_http_client()
+            pooled = PooledKey(f"...{key.api_key[-4:]}", create_client(key, http_client), http_client)
+            http_client.event_hooks["response"].append(self._response_hook(pooled))
+            self.keys.append(pooled)
+        logger.info(f"{provider_name} key pool initialized with {len(self.keys)} key(s)")
+
+    def _response_hook(self, key: PooledKey) -> Callable:
+        """Create an HTTP response hook that updates a key's rate-limit state."""
+        async def hook(response: httpx.Response) -> None:
+            if not response.request.extensions.get(PROBE_EXTENSION):
+                self._update_limits(key, response)
+        return hook
+
+    def _update_limits(self, key: PooledKey, response: httpx.Response) -> None:
+        """Read rate-limit headers (OpenAI/Groq and Anthropic styles) and apply cooldowns."""
+        headers = response.headers
+        now = time.monotonic()
+
+        remaining_requests = _int_header(headers, "x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining")
+        remaining_tokens = _int_header(headers, "x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining")
+        if remaining_requests is not None or remaining_tokens is not None:
+            key.remaining_requests = remaining_requests
+            key.remaining_tokens = remaining_tokens
+            key.limit_requests = _int_header(headers, "x-ratelimit-limit-requests", "anthropic-ratelimit-requests-limit")
+            key.limit_tokens = _int_header(headers, "x-ratelimit-limit-tokens", "anthropic-ratelimit-tokens-limit")
+            resets = [
+                _parse_reset(headers.get(name)) for name in (
+                    "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens",
+                    "anthropic-ratelimit-requests-reset", "anthropic-ratelimit-tokens-reset"
+                )
+            ]
+            resets = [reset for reset in resets if reset is not None]
+            key.reset_at = now + (max(resets) if resets else 60.0)
+
+        if response.status_code == 429:
+            retry_after = _parse_reset(headers.get("retry-after"))
+            self._cool_down(key, retry_after or self.cooldown_seconds, "rate limited")
+        elif response.status_code in AUTH_STATUS_CODES:
+            self._cool_down(key, self.cooldown_seconds * 10, f"rejected ({response.status_code})")
+
+    def _cool_down(self, key: PooledKey, seconds: float, reason: str) -> None:
+        """Take a key out of rotation for a while."""
+        key.cooldown_until = max(key.cooldown_until, time.monotonic() + seconds)
+        logger.warning(f"{self.provider_name} key {key.label} {reason} - cooling down for {seconds:.0f}s")
+
+    def acquire(self) -> PooledKey:
+        """
+        Pick the key with the most remaining headroom.
+
+        Keys in cooldown are skipped; if all keys are cooling down, the one
+        that becomes available first is used.
+
+        Returns:
+            Selected key
+        """
+        now = time.monotonic()
+        available = [key for key in self.keys if key.cooldown_until <= now]
+        if not available:
+            return min(self.keys, key=lambda key: key.cooldown_until)
+        return max(available, key=lambda key: key.headroom(now))
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        """
+        Use the best key's SDK client for one request.
+
+        Only transient errors and rejected keys count towards the key's
+        consecutive failures; other errors (e.g. a 400 for an oversized
+        request) are the request's fault, not the key's.
+
+        Yields:
+            SDK client of the selected key
+        """
+        key = self.acquire()
+        key.in_flight += 1
+        key.requests += 1
+        try:
+            yield key.client
+        except Exception as e:
+            if not _is_key_failure(e):
+                key.consecutive_failures = 0
+                raise
+            key.failures += 1
+            key.consecutive_failures += 1
+            if key.consecutive_failures >= self.failure_threshold:
+                key.consecutive_failures = 0
+                self._cool_down(key, self.cooldown_seconds, f"failed {self.failure_threshold} times in a row")
+            raise
+        else:
+            key.consecutive_failures = 0
+        finally:
+            key.in_flight -= 1
+
+    async def run(self, request: Callable[[Any], Awaitable[T]]) -> T:
+        """
+        Run one API call, retrying transient failures on the best available key.
+
+        A rate-limited key is cooled down by the response hook, so the retry
+        goes to another key without waiting. If every key is cooling down
+        for longer than the maximum backoff, or the message deadline is too
+        close for another attempt, the error is raised instead.
+
+        Args:
+            request: Coroutine function that performs the call with an SDK client
+
+        Returns:
+            Result of the call
+        """
+        attempt = 0
+        while True:
+            try:
+                with self.lease() as client:
+                    return await request(client)
+            except Exception as e:
+                attempt += 1
+                if attempt >= MAX_ATTEMPTS or not _is_retryable(e):
+                    raise
+
+                delay = min(0.5 * 2 ** (attempt - 1), MAX_BACKOFF_SECONDS)
+                if getattr(e, "status_code", None) == 429:
+                    delay = max(self.acquire().cooldown_until - time.monotonic(), 0.0)
+                    if delay > MAX_BACKOFF_SECONDS:
+                        raise
+                left = time_left()
+                if left is not None and left - delay < MIN_ATTEMPT_SECONDS:
+                    logger.debug(f"{self.provider_name} request failed ({str(e)}), deadline too close to retry")
+                    raise
+                logger.debug(f"{self.provider_name} request failed ({str(e)}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def get_stats(self) -> list[dict]:
+        """
+        Get per-key utilisation.
+
+        Returns:
+            One dict per key with request counts, rate-limit headroom and cooldown
+        """
+        now = time.monotonic()
+        return [
+            {
+                "key": key.label,
+                "requests": key.requests,
+                "failures": key.failures,
+                "in_flight": key.in_flight,
+                "remaining_requests": key.remaining_requests,
+                "limit_requests": key.limit_requests,
+                "remaining_tokens": key.remaining_tokens,
+                "limit_tokens": key.limit_tokens,
+                "headroom": round(key.headroom(now), 3),
+                "cooldown_seconds": round(max(key.cooldown_until - now, 0.0), 1)
+            }
+            for key in self.keys
+        ]
@@ -4,8 +4,12 @@ Uses OpenAI's GPT models (paid service).
 """
 
 import logging
+import time
+from typing import Sequence
+import httpx
 from openai import AsyncOpenAI
-from app.services.ai.base import AIProvider, ChatMessage
+from app.services.ai.base import AIProvider, ChatMessage, GenerationResult
+from app.services.ai.key_pool import ProviderKey
 
 logger = logging.getLogger(__name__)
 
@@ -13,49 +17,70 @@ logger = logging.getLogger(__name__)
 class OpenAIProvider(AIProvider):
     """OpenAI provider using GPT models."""
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        keys: list[ProviderKey] | None = None
+    ):
         """
         Initialize OpenAI provider.
 
         Args:
             api_key: OpenAI API key from platform.openai.com
+            base_url: Optional API base URL override (e.g. a local fake server)
+            keys: Optional pool of API keys (used instead of api_key)
         """
-        self.client = AsyncOpenAI(api_key=api_key)
+        self._init_key_pool(api_key, base_url, keys)
         self.model = "gpt-4o-mini"  # Cost-effective and capable model
+        self.fallback_model = "gpt-4o-mini"  # Already the cheapest tier
         logger.info(f"Initialized OpenAI provider with model: {self.model}")
 
+    def _create_client(self, key: ProviderKey, http_client: httpx.AsyncClient) -> AsyncOpenAI:
+        """Create an OpenAI SDK client for one pooled key."""
+        return AsyncOpenAI(
+            api_key=key.api_key,
+            base_url=key.base_url,
+            organization=key.organization,
+            http_client=http_client,
+            max_retries=0  # Retries are handled by the key pool
+        )
+
     async def generate_response(
         self,
         user_message: str,
-        conversation_history: list[ChatMessage] | None = None
-    ) -> str:
+        conversation_history: Sequence[ChatMessage] | None = None,
+        max_tokens: int | None = None,
+        model: str | None = None
+    ) -> GenerationResult:
         """Generate a response using OpenAI's GPT model."""
         try:
-            # Build messages array
-            messages = [{"role": "system", "content": self.SYSTEM_PROMPT}]
-
-            # Add conversation history if provided
-            if conversation_history:
-                for msg in conversation_history:
-                    messages.append({"role": msg.role, "content": msg.content})
-
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
+            messages = self.build_messages(user_message, conversation_history)
 
             # Call OpenAI API
             logger.debug(f"Calling OpenAI API with {len(messages)} messages")
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            start = time.perf_counter()
+            response = await self.key_pool.run(lambda client: client.chat.completions.create(
+                model=model or self.model,
                 messages=messages,
                 temperature=0.7,
-                max_tokens=1024,
+                max_tokens=max_tokens or self.max_tokens,
                 top_p=1
-            )
+            ))
 
             # Extract response text
             response_text = response.choices[0].message.content
             logger.info(f"OpenAI response generated: {len(response_text)} characters")
-            return response_text
+            usage = response.usage
+            details = usage.prompt_tokens_details if usage else None
+            return GenerationResult(
+                text=response_text,
+                input_tokens=usage.prompt_tokens if usage else 0,
+                output_tokens=usage.completion_tokens if usage else 0,
+                cached_tokens=(details.cached_tokens or 0) if details else 0,
+                model=response.model,
+                latency_ms=(time.perf_counter() - start) * 1000
+            )
 
         except Exception as e:
             logger.error(f"OpenAI API error: {str(e)}")
@@ -0,0 +1,339 @@
+"""
+High-throughput broadcast engine for WhatsApp template messages.
+Streams recipients from CSV or JSONL, sends with bounded concurrency under
+the phone number's rate limit, and checkpoints progress so interrupted
+runs resume where they left off.
+"""
+
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Iterator
+from app.services.whatsapp import WhatsAppService, WhatsAppAPIError
+
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying: throughput limit, pair rate limit, temporary service errors
+RETRYABLE_ERROR_CODES = {4, 80007, 130429, 131016, 131048, 131056}
+
+
+def iter_recipients(path: str) -> Iterator[tuple[str, list[str]]]:
+    """
+    Stream recipients and template parameters from a CSV or JSONL file.
+
+    CSV files need a "to" column; every other column is a template body
+    parameter, in column order. JSONL lines are objects with "to" and an
+    optional "parameters" list.
+
+    Args:
+        path: Path to a .csv or .jsonl file
+
+    Yields:
+        Tuples of (recipient phone number, template parameters)
+
+    Raises:
+        ValueError: If the file has no "to" column or a record is malformed
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if Path(path).suffix.lower() == ".csv":
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "to" not in reader.fieldnames:
+                raise ValueError(f"{path}: CSV header needs a 'to' column (found: {reader.fieldnames})")
+            for row in reader:
+                if None in row:
+                    raise ValueError(f"{path}:{reader.line_num}: row has more cells than the header")
+                to = row.pop("to")
+                if not to:
+                    raise ValueError(f"{path}:{reader.line_num}: row has no 'to' value")
+                yield to, [value for value in row.values() if value is not None]
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if not isinstance(entry, dict) or "to" not in entry:
+                    raise ValueError(f"{path}:{line_number}: record needs a 'to' field")
+                yield str(entry["to"]), [str(value) for value in entry.get("parameters", [])]
+
+
+def describe_run(recipients_path: str | None, template_name: str, language_code: str) -> dict:
+    """
+    Identify a broadcast run so a checkpoint is only resumed by the same run.
+
+    Args:
+        recipients_path: Recipients file (None if the recipients are not read from a file)
+        template_name: Template being sent
+        language_code: Template language code
+
+    Returns:
+        Dict with the template, language and the recipients file's path, size and SHA-256
+    """
+    run = {"template": template_name, "language": language_code, "recipients": None}
+    if recipients_path:
+        digest = hashlib.sha256()
+        with open(recipients_path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        run["recipients"] = {
+            "path": str(Path(recipients_path).resolve()),
+            "size": os.path.getsize(recipients_path),
+            "sha256": digest.hexdigest()
+        }
+    return run
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter (tokens are reserved in arrival order)."""
+
+    def __init__(self, rate: float, burst: int | None = None):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            burst: Maximum bucket size (defaults to one second of tokens)
+        """
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Take one token, waiting until it is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class BroadcastCheckpoint:
+    """
+    Resumable progress of a broadcast run.
+
+    Records complete out of order, so progress is stored as the index below
+    which every record is done, plus the completed indices above it (at most
+    the number of records in flight). Indices only mean something for the
+    recipients file they were counted in, so the checkpoint also stores the
+    run it belongs to (see describe_run) and refuses to resume any other.
+    """
+
+    def __init__(self, path: str | None, run: dict | None = None):
+        """
+        Initialize checkpoint, loading previous progress if the file exists.
+
+        Args:
+            path: Checkpoint file path (None disables checkpointing)
+            run: Identity of the current run, from describe_run
+
+        Raises:
+            ValueError: If the checkpoint file was written by a different run
+        """
+        self.path = path
+        self.run = run
+        self.next_index = 0
+        self.completed_ahead: set[int] = set()
+        self.sent = 0
+        self.failed = 0
+
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            saved_run = state.get("run") or {}
+            current_run = run or {}
+            mismatched = [
+                key for key in current_run.keys() | saved_run.keys()
+                if saved_run.get(key) != current_run.get(key)
+            ]
+            if mismatched:
+                raise ValueError(
+                    f"Checkpoint {path} belongs to a different broadcast "
+                    f"({', '.join(sorted(mismatched))} changed); use a new checkpoint file or delete this one"
+                )
+            self.next_index = state["next_index"]
+            self.completed_ahead = set(state["completed_ahead"])
+            self.sent = state["sent"]
+            self.failed = state["failed"]
+            logger.info(f"Resuming broadcast from record {self.next_index} ({self.sent} sent, {self.failed} failed)")
+
+    def is_done(self, index: int) -> bool:
+        """Check whether a record was completed in a previous run."""
+        return index < self.next_index or index in self.completed_ahead
+
+    def complete(self, index: int, success: bool) -> None:
+        """Mark a record as completed and advance the watermark."""
+        if success:
+            self.sent += 1
+        else:
+            self.failed += 1
+        self.completed_ahead.add(index)
+        while self.next_index in self.completed_ahead:
+            self.completed_ahead.remove(self.next_index)
+            self.next_index += 1
+
+    def save(self) -> None:
+        """Atomically write the checkpoint file."""
+        if not self.path:
+            return
+        state = {
+            "run": self.run,
+            "next_index": self.next_index,
+            "completed_ahead": sorted(self.completed_ahead),
+            "sent": self.sent,
+            "failed": self.failed
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+
+class BroadcastRunner:
+    """Sends a template message to every recipient of a streamed list."""
+
+    def __init__(
+        self,
+        whatsapp: WhatsAppService,
+        template_name: str,
+        language_code: str = "en_US",
+        concurrency: int = 32,
+        rate_limit: float = 80.0,
+        max_retries: int = 3,
+        checkpoint_path: str | None = None,
+        checkpoint_interval: float = 2.0,
+        recipients_path: str | None = None
+    ):
+        """
+        Initialize broadcast runner.
+
+        Args:
+            whatsapp: WhatsApp service used for sending
+            template_name: Name of the approved message template
+            language_code: Template language code
+            concurrency: Maximum number of sends in flight
+            rate_limit: Maximum messages per second for the sending phone number
+            max_retries: Retries for rate-limited or temporarily failing sends
+            checkpoint_path: Optional checkpoint file for resuming interrupted runs
+            checkpoint_interval: Seconds between checkpoint writes
+            recipients_path: Recipients file, recorded in the checkpoint so a resume must use the same file
+
+        Raises:
+            ValueError: If the checkpoint file was written by a different run
+        """
+        self.whatsapp = whatsapp
+        self.template_name = template_name
+        self.language_code = language_code
+        self.concurrency = concurrency
+        self.rate_limiter = TokenBucket(rate_limit)
+        self.max_retries = max_retries
+        run = describe_run(recipients_path, template_name, language_code) if checkpoint_path else None
+        self.checkpoint = BroadcastCheckpoint(checkpoint_path, run)
+        self.checkpoint_interval = checkpoint_interval
+        self.failures_path = f"{checkpoint_path}.failures.jsonl" if checkpoint_path else None
+        self.failures_by_code: dict[str, int] = {}
+        self.retries = 0
+        self.skipped = 0
+
+    async def _send(self, to: str, parameters: list[str]) -> WhatsAppAPIError | None:
+        """Send one message, retrying rate-limited and temporary failures."""
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            try:
+                await self.whatsapp.send_template_message(
+                    to=to,
+                    template_name=self.template_name,
+                    language_code=self.language_code,
+                    parameters=parameters
+                )
+                return None
+            except WhatsAppAPIError as e:
+                retryable = (
+                    e.status_code is None
+                    or e.status_code == 429
+                    or e.status_code >= 500
+                    or e.error_code in RETRYABLE_ERROR_CODES
+                )
+                if not retryable or attempt == self.max_retries:
+                    return e
+                self.retries += 1
+                await asyncio.sleep(2 ** attempt)
+
+    def _record_failure(self, index: int, to: str, error: WhatsAppAPIError) -> None:
+        """Count a failed send and append it to the failures file."""
+        code = str(error.error_code or error.status_code or "network")
+        self.failures_by_code[code] = self.failures_by_code.get(code, 0) + 1
+        if self.failures_path:
+            with open(self.failures_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"index": index, "to": to, "code": code, "error": str(error)}) + "\n")
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        """Send queued records until the end-of-input marker arrives."""
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, to, parameters = item
+            error = await self._send(to, parameters)
+            if error is not None:
+                self._record_failure(index, to, error)
+            self.checkpoint.complete(index, error is None)
+
+    async def _checkpointer(self, started: float) -> None:
+        """Periodically save progress and log throughput."""
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            self.checkpoint.save()
+            elapsed = time.monotonic() - started
+            logger.info(
+                f"Broadcast progress: {self.checkpoint.sent} sent, {self.checkpoint.failed} failed "
+                f"({self.checkpoint.sent / elapsed:.1f} msg/s)"
+            )
+
+    async def run(self, recipients: Iterator[tuple[str, list[str]]]) -> dict:
+        """
+        Send to all recipients not completed in a previous run.
+
+        Args:
+            recipients: Stream of (phone number, template parameters)
+
+        Returns:
+            Report with counts, throughput and failures by error code
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        started = time.monotonic()
+        sent_before = self.checkpoint.sent
+        checkpointer = asyncio.create_task(self._checkpointer(started))
+
+        try:
+            for index, (to, parameters) in enumerate(recipients):
+                if self.checkpoint.is_done(index):
+                    self.skipped += 1
+                    continue
+                await queue.put((index, to, parameters))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            checkpointer.cancel()
+            for worker in workers:
+                worker.cancel()
+            self.checkpoint.save()
+
+        elapsed = time.monotonic() - started
+        sent = self.checkpoint.sent - sent_before
+        return {
+            "sent": self.checkpoint.sent,
+            "failed": self.checkpoint.failed,
+            "skipped_from_checkpoint": self.skipped,
+            "retries": self.retries,
+            "duration_seconds": round(elapsed, 2),
+            "messages_per_second": round(sent / elapsed, 1) if elapsed else 0.0,
+            "failures_by_code": self.failures_by_code
+        }
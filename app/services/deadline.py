@@ -0,0 +1,132 @@
+"""
+Per-message deadlines with stage-level timeouts.
+
+A deadline is started when a message arrives and bounds the whole reply.
+Each stage (mark-read, provider call, send) runs under whatever time is
+left, optionally capped or keeping a reserve for the stages after it.
+The running stage's end time is kept in a context variable so that code
+deep in the call chain (e.g. provider retries) can see how much time is left.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+# Monotonic time by which the currently running stage must finish
+_stage_end: ContextVar[float | None] = ContextVar("stage_end", default=None)
+
+
+def time_left() -> float | None:
+    """
+    Get the time left in the currently running stage.
+
+    Returns:
+        Seconds left, or None if no deadline applies
+    """
+    stage_end = _stage_end.get()
+    return None if stage_end is None else stage_end - time.monotonic()
+
+
+class DeadlineExceeded(Exception):
+    """A stage did not finish before the message deadline."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Deadline exceeded in stage: {stage}")
+        self.stage = stage
+
+
+class DeadlineStats:
+    """Counts stage runs, deadline misses and fallback replies."""
+
+    def __init__(self):
+        self.stages: dict[str, list[int]] = {}  # stage -> [runs, misses]
+        self.fallback_replies = 0
+
+    def record(self, stage: str, missed: bool) -> None:
+        """Record one stage run."""
+        counts = self.stages.setdefault(stage, [0, 0])
+        counts[0] += 1
+        counts[1] += missed
+
+    def get_stats(self) -> dict:
+        """
+        Get deadline statistics.
+
+        Returns:
+            Dict with runs, misses and miss rate per stage, and fallback replies sent
+        """
+        return {
+            "stages": {
+                stage: {
+                    "runs": runs,
+                    "misses": misses,
+                    "miss_rate": round(misses / runs, 4) if runs else 0.0
+                }
+                for stage, (runs, misses) in self.stages.items()
+            },
+            "fallback_replies": self.fallback_replies
+        }
+
+
+class Deadline:
+    """Time budget for handling one message."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, seconds: float):
+        """
+        Start a deadline.
+
+        Args:
+            seconds: Time budget from now
+        """
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds until the deadline (negative once passed)."""
+        return self.expires_at - time.monotonic()
+
+    @asynccontextmanager
+    async def stage(self, name: str, cap: float | None = None, reserve: float = 0.0) -> AsyncIterator[None]:
+        """
+        Run a stage under the time left before the deadline.
+
+        Args:
+            name: Stage name used in statistics
+            cap: Optional maximum time for this stage
+            reserve: Time kept free for the stages after this one
+
+        Raises:
+            DeadlineExceeded: If the stage has no time left or does not finish in time
+        """
+        budget = self.remaining() - reserve
+        if cap is not None:
+            budget = min(budget, cap)
+        if budget <= 0:
+            deadline_stats.record(name, missed=True)
+            raise DeadlineExceeded(name)
+
+        timeout = asyncio.timeout(budget)
+        token = _stage_end.set(time.monotonic() + budget)
+        missed = False
+        try:
+            async with timeout:
+                yield
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            missed = True
+            logger.warning(f"Stage '{name}' missed its deadline ({budget:.1f}s)")
+            raise DeadlineExceeded(name) from None
+        finally:
+            _stage_end.reset(token)
+            deadline_stats.record(name, missed)
+
+
+# Global deadline statistics
+deadline_stats = DeadlineStats()
@@ -0,0 +1,144 @@
+"""
+Delivery-latency analytics built from WhatsApp message status callbacks.
+
+Latencies are measured on Meta's clock: the "sent" status timestamp is the
+baseline, and our own send time (floored the same way) is only used until
+that status arrives. Status timestamps are whole seconds, so latencies have a
+resolution of one second.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from app.config import settings
+from app.services.metrics import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingMessage:
+    """Timestamps of an outbound message that has not been read or failed yet."""
+
+    __slots__ = ("sent_at", "delivered_at")
+
+    def __init__(self, sent_at: int):
+        self.sent_at = sent_at
+        self.delivered_at: int | None = None
+
+
+class DeliveryTracker:
+    """Links outbound message IDs to status events and aggregates delivery latency."""
+
+    def __init__(self, max_pending: int = 10000):
+        """
+        Initialize delivery tracker.
+
+        Args:
+            max_pending: Maximum number of outbound messages awaiting status events
+        """
+        self.max_pending = max_pending
+        self.pending: OrderedDict[str, _PendingMessage] = OrderedDict()
+        self.send_to_delivered = QuantileSketch()
+        self.delivered_to_read = QuantileSketch()
+        self.failures: dict[str, dict] = {}
+        self.tracked = 0
+        self.failed = 0
+        self.evicted = 0
+        logger.info(f"Delivery tracker initialized (max pending: {max_pending})")
+
+    def track_sent(self, send_result: dict) -> None:
+        """
+        Start tracking the messages returned by a send API call.
+
+        Args:
+            send_result: Response of WhatsAppService.send_text_message
+        """
+        # Whole seconds, like Meta's status timestamps (replaced by the "sent" status)
+        now = int(time.time())
+        for message in send_result.get("messages", []):
+            message_id = message.get("id")
+            if not message_id:
+                continue
+
+            self.pending[message_id] = _PendingMessage(now)
+            self.tracked += 1
+
+            # Keep the pending map bounded (drop the oldest entries)
+            while len(self.pending) > self.max_pending:
+                self.pending.popitem(last=False)
+                self.evicted += 1
+
+    def record_status(self, status: dict) -> None:
+        """
+        Record a status event (sent, delivered, read or failed).
+
+        Args:
+            status: Status object from the webhook payload
+        """
+        entry = self.pending.get(status.get("id"))
+        if entry is None:
+            # Not one of our tracked messages (or already evicted)
+            return
+
+        state = status.get("status")
+        try:
+            timestamp = int(float(status.get("timestamp")))
+        except (TypeError, ValueError):
+            timestamp = int(time.time())
+
+        if state == "sent":
+            # Meta's own send time is the baseline (same clock and resolution as the other statuses)
+            if entry.delivered_at is None:
+                entry.sent_at = timestamp
+
+        elif state == "delivered":
+            if entry.delivered_at is None:
+                entry.delivered_at = timestamp
+                self.send_to_delivered.add(timestamp - entry.sent_at)
+
+        elif state == "read":
+            if entry.delivered_at is None:
+                # Read implies delivered; WhatsApp may skip or reorder the delivered event
+                entry.delivered_at = timestamp
+                self.send_to_delivered.add(timestamp - entry.sent_at)
+            self.delivered_to_read.add(timestamp - entry.delivered_at)
+            del self.pending[status["id"]]
+
+        elif state == "failed":
+            self.failed += 1
+            for error in status.get("errors") or [{}]:
+                code = str(error.get("code", "unknown"))
+                failure = self.failures.setdefault(code, {"count": 0, "title": error.get("title")})
+                failure["count"] += 1
+            del self.pending[status["id"]]
+
+    def get_stats(self) -> dict:
+        """
+        Get aggregated delivery statistics.
+
+        Returns:
+            Dict with latency percentiles (seconds, one-second resolution) and failure rates
+        """
+        return {
+            "tracked": self.tracked,
+            "pending": len(self.pending),
+            "evicted": self.evicted,
+            "send_to_delivered_seconds": self.send_to_delivered.summary(),
+            "delivered_to_read_seconds": self.delivered_to_read.summary(),
+            "failures": {
+                "total": self.failed,
+                "rate": round(self.failed / self.tracked, 4) if self.tracked else 0.0,
+                "by_error_code": {
+                    code: {
+                        "count": failure["count"],
+                        "rate": round(failure["count"] / self.tracked, 4) if self.tracked else 0.0,
+                        "title": failure["title"]
+                    }
+                    for code, failure in self.failures.items()
+                }
+            }
+        }
+
+
+# Global delivery tracker instance
+delivery_tracker = DeliveryTracker(max_pending=settings.delivery_tracking_max_pending)
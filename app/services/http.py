@@ -0,0 +1,41 @@
+"""
+Shared HTTP transport settings for outbound API clients.
+"""
+
+import importlib.util
+import logging
+import httpx
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """Check whether the optional h2 package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create an async HTTP client using the configured pool, keep-alive and timeout settings.
+
+    Returns:
+        Configured httpx.AsyncClient instance
+    """
+    http2 = settings.http2_enabled
+    if http2 and not _http2_available():
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed; falling back to HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        ),
+        timeout=httpx.Timeout(
+            settings.http_timeout,
+            connect=settings.http_connect_timeout
+        )
+    )
@@ -0,0 +1,238 @@
+"""
+Deterministic fast-path intent router.
+Answers commands and menu picks ("reset", "menu", "1", "human agent") with
+canned or templated replies, without calling the LLM.
+
+Messages are normalized (lowercase, collapsed whitespace, trailing punctuation
+removed) and then matched against exact phrases in a dict and against all
+regex patterns compiled into a single alternation, so a message that matches
+nothing costs one hash lookup and one regex scan before falling through.
+"""
+
+import json
+import logging
+import re
+import string
+import time
+from pathlib import Path
+from typing import Literal
+from pydantic import BaseModel, Field, model_validator
+from app.services.metrics import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+# Longer messages are never commands, so they skip matching entirely
+MAX_COMMAND_LENGTH = 100
+
+_NAMED_GROUP = re.compile(r"(?<!\\)\(\?P<\w+>")
+
+# Constructs that change meaning once a pattern is part of the combined alternation:
+# backreferences and conditionals (group numbers/names are rewritten) and global
+# inline flags (they would apply to every pattern). Other escapes are matched too,
+# so that an escaped parenthesis is skipped.
+_UNSUPPORTED_SYNTAX = re.compile(r"(?P<unsupported>\\[1-9]|\(\?P=|\(\?\(|\(\?[aiLmsux]+\))|\\.")
+
+
+class _TemplateVariables(dict):
+    """Template variables that leave unknown placeholders untouched."""
+
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+class Intent(BaseModel):
+    """A command or menu pick answered without the LLM."""
+
+    name: str = Field(description="Intent name used in statistics")
+    phrases: list[str] = Field(default_factory=list, description="Exact phrases (matched after normalization)")
+    patterns: list[str] = Field(
+        default_factory=list,
+        description="Regexes matched against the whole normalized message; named groups become template variables"
+    )
+    reply: str = Field(
+        description="Reply text; {phone_number} and named groups are substituted ({{ and }} for literal braces)"
+    )
+    action: Literal["clear_history"] | None = Field(default=None, description="Built-in action to run")
+
+    @model_validator(mode="after")
+    def check_reply(self) -> "Intent":
+        """Require a reply template whose fields are all named placeholders."""
+        try:
+            fields = [field for _, field, _, _ in string.Formatter().parse(self.reply) if field is not None]
+        except ValueError as e:
+            raise ValueError(
+                f"Intent '{self.name}' has a malformed reply {self.reply!r}: {e} "
+                f"(write {{{{ and }}}} for literal braces)"
+            ) from None
+        for field in fields:
+            if not field.isidentifier():
+                raise ValueError(
+                    f"Intent '{self.name}' reply {self.reply!r} has an unsupported field {{{field}}}: "
+                    f"use named placeholders like {{phone_number}}, and {{{{ and }}}} for literal braces"
+                )
+        try:
+            self.reply.format_map(_TemplateVariables())
+        except ValueError as e:
+            raise ValueError(f"Intent '{self.name}' has an invalid reply {self.reply!r}: {e}") from None
+        return self
+
+    @model_validator(mode="after")
+    def check_matchers(self) -> "Intent":
+        """Require at least one phrase or pattern, and patterns the router can combine."""
+        if not self.phrases and not self.patterns:
+            raise ValueError(f"Intent '{self.name}' needs phrases or patterns")
+        for pattern in self.patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Intent '{self.name}' has an invalid pattern {pattern!r}: {e}") from None
+            for syntax in _UNSUPPORTED_SYNTAX.finditer(pattern):
+                if syntax["unsupported"]:
+                    raise ValueError(
+                        f"Intent '{self.name}' pattern {pattern!r} uses {syntax['unsupported']!r}: backreferences, "
+                        f"conditionals and global inline flags are not supported (use scoped flags like (?i:...))"
+                    )
+        return self
+
+
+BUILTIN_INTENTS = [
+    Intent(
+        name="clear_history",
+        phrases=["clear", "reset", "restart", "/clear", "/reset", "start over", "new conversation"],
+        reply="✅ Conversation history cleared! What would you like to talk about?",
+        action="clear_history"
+    )
+]
+
+
+def normalize(text: str) -> str:
+    """Normalize a message for matching: lowercase, collapse whitespace, drop trailing punctuation."""
+    return " ".join(text.lower().split()).rstrip(".!?")
+
+
+class IntentRouter:
+    """Matches messages against configured intents."""
+
+    def __init__(self, intents: list[Intent] | None = None):
+        """
+        Initialize intent router.
+
+        Args:
+            intents: Intents to match (defaults to the built-in intents)
+        """
+        self.intents: dict[str, Intent] = {}
+        self._phrases: dict[str, Intent] = {}
+        self._pattern: re.Pattern | None = None
+        self._pattern_intents: dict[str, tuple[Intent, re.Pattern]] = {}
+        self.checked = 0
+        self.hits: dict[str, int] = {}
+        self.match_time = QuantileSketch()  # microseconds
+        self.update(BUILTIN_INTENTS if intents is None else intents)
+
+    def update(self, intents: list[Intent]) -> None:
+        """
+        Add intents (replacing any with the same name) and recompile the matchers.
+
+        Args:
+            intents: Intents to add
+        """
+        for intent in intents:
+            self.intents[intent.name] = intent
+
+        self._phrases = {}
+        alternatives = []
+        self._pattern_intents = {}
+        for intent in self.intents.values():
+            for phrase in intent.phrases:
+                self._phrases.setdefault(normalize(phrase), intent)
+            for pattern in intent.patterns:
+                group = f"p{len(alternatives)}"
+                self._pattern_intents[group] = (intent, re.compile(pattern))
+                # Named groups must be unique in the combined regex; they are read from the intent's own pattern
+                alternatives.append(f"(?P<{group}>{_NAMED_GROUP.sub('(', pattern)})")
+        self._pattern = re.compile("|".join(alternatives)) if alternatives else None
+
+    def load(self, path: str) -> int:
+        """
+        Load intents from a JSONL file.
+
+        Each line is an object with "name", "reply" and "phrases" and/or
+        "patterns" (optionally "action"). An intent named like a built-in
+        one replaces it.
+
+        Args:
+            path: Path to the JSONL file
+
+        Returns:
+            Number of intents loaded
+        """
+        intents = []
+        with Path(path).open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    intents.append(Intent(**json.loads(line)))
+        self.update(intents)
+        logger.info(f"Loaded {len(intents)} intents from {path}")
+        return len(intents)
+
+    def match(self, text: str) -> tuple[Intent, dict[str, str]] | None:
+        """
+        Find the intent a message triggers.
+
+        Args:
+            text: User's message text
+
+        Returns:
+            Tuple of (intent, template variables from named groups), or None if nothing matches
+        """
+        start = time.perf_counter()
+        self.checked += 1
+        result = None
+
+        if len(text) <= MAX_COMMAND_LENGTH:
+            normalized = normalize(text)
+            intent = self._phrases.get(normalized)
+            if intent is not None:
+                result = (intent, {})
+            elif self._pattern is not None:
+                combined = self._pattern.fullmatch(normalized)
+                if combined is not None:
+                    intent, pattern = self._pattern_intents[combined.lastgroup]
+                    variables = pattern.fullmatch(normalized)
+                    result = (intent, variables.groupdict() if variables else {})
+
+        if result is not None:
+            self.hits[result[0].name] = self.hits.get(result[0].name, 0) + 1
+        self.match_time.add((time.perf_counter() - start) * 1e6)
+        return result
+
+    @staticmethod
+    def render(intent: Intent, variables: dict[str, str]) -> str:
+        """
+        Render an intent's reply.
+
+        Args:
+            intent: Matched intent
+            variables: Template variables
+
+        Returns:
+            Reply text with known placeholders substituted
+        """
+        return intent.reply.format_map(_TemplateVariables(variables))
+
+    def get_stats(self) -> dict:
+        """
+        Get router statistics.
+
+        Returns:
+            Dict with hit rate, hits per intent and match time percentiles (µs)
+        """
+        hits = sum(self.hits.values())
+        return {
+            "intents": len(self.intents),
+            "checked": self.checked,
+            "hits": hits,
+            "hit_rate": round(hits / self.checked, 4) if self.checked else 0.0,
+            "by_intent": dict(sorted(self.hits.items(), key=lambda item: item[1], reverse=True)),
+            "match_time_us": self.match_time.summary()
+        }
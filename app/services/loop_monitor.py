@@ -0,0 +1,158 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+"""
+
+import asyncio
+import bisect
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from app.config import settings
+from app.services.metrics import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up from a fixed-interval sleep.
+
+    Any lag means something held the loop (synchronous work) and delayed
+    every other conversation by that amount. Lag is recorded into a
+    fixed-bucket histogram and a quantile sketch.
+
+    In debug mode a watchdog thread additionally watches the monitor's
+    heartbeat; when the loop stays blocked longer than the threshold it
+    captures the loop thread's stack and the task that was running.
+    """
+
+    # Histogram bucket upper bounds in milliseconds
+    BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+    def __init__(self, interval: float = 0.1, blocking_threshold_ms: float = 100.0, capture_stacks: bool = False):
+        """
+        Initialize loop lag monitor.
+
+        Args:
+            interval: Seconds between lag measurements
+            blocking_threshold_ms: Blocking duration that triggers a stack capture
+            capture_stacks: Whether to run the blocking-call detector thread
+        """
+        self.interval = interval
+        self.blocking_threshold_ms = blocking_threshold_ms
+        self.capture_stacks = capture_stacks
+        self.bucket_counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.lag = QuantileSketch()
+        self.blocking_events: deque[dict] = deque(maxlen=20)
+        self._heartbeat = time.monotonic()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    async def start(self) -> None:
+        """Start measuring lag on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run())
+
+        if self.capture_stacks:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+        logger.info(f"Event-loop monitor started (interval: {self.interval}s, stack capture: {self.capture_stacks})")
+
+    async def stop(self) -> None:
+        """Stop the monitor and the watchdog thread."""
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def record(self, lag_ms: float) -> None:
+        """Record one lag measurement in milliseconds."""
+        self.bucket_counts[bisect.bisect_left(self.BUCKETS_MS, lag_ms)] += 1
+        self.lag.add(lag_ms)
+
+    async def _run(self) -> None:
+        """Sleep for a fixed interval and record how late the wake-up was."""
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            self.record(max(now - start - self.interval, 0.0) * 1000)
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop's stack when the heartbeat stalls."""
+        threshold = self.blocking_threshold_ms / 1000
+        captured_heartbeat = None
+
+        while not self._stop.wait(threshold / 2):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked < threshold or heartbeat == captured_heartbeat:
+                continue
+
+            # Capture once per stall
+            captured_heartbeat = heartbeat
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+
+            task = asyncio.current_task(self._loop)
+            stack = traceback.format_list(traceback.extract_stack(frame))
+            event = {
+                "timestamp": time.time(),
+                "blocked_ms": round(blocked * 1000, 1),
+                "task": task.get_name() if task else None,
+                "coroutine": task.get_coro().__qualname__ if task else None,
+                "stack": [line.rstrip() for line in stack]
+            }
+            self.blocking_events.append(event)
+            logger.warning(
+                f"Event loop blocked for {event['blocked_ms']} ms in task {event['task']} "
+                f"({event['coroutine']}):\n{''.join(stack)}"
+            )
+
+    def get_stats(self) -> dict:
+        """
+        Get the lag histogram and recent blocking events.
+
+        Returns:
+            Dict with cumulative histogram buckets (ms), percentiles and blocking events
+        """
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(self.BUCKETS_MS + ["+Inf"], self.bucket_counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+
+        return {
+            "interval_seconds": self.interval,
+            "lag_ms": self.lag.summary(),
+            "histogram_ms": buckets,
+            "blocking_threshold_ms": self.blocking_threshold_ms,
+            "blocking_events": list(self.blocking_events)
+        }
+
+
+# Global event-loop monitor instance
+loop_monitor = LoopLagMonitor(
+    interval=settings.loop_monitor_interval,
+    blocking_threshold_ms=settings.loop_blocking_threshold_ms,
+    capture_stacks=settings.debug
+)
@@ -0,0 +1,110 @@
+"""
+Constant-memory streaming metrics used for latency analytics.
+"""
+
+import math
+
+
+class QuantileSketch:
+    """
+    Streaming quantile estimator with bounded memory.
+
+    Values are counted in logarithmically sized buckets, so every quantile is
+    returned within the configured relative accuracy. When the number of
+    buckets exceeds the limit, the lowest buckets are merged, which only
+    affects accuracy of the smallest values.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        """
+        Initialize the sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of reported quantiles
+            max_buckets: Maximum number of buckets kept in memory
+        """
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """
+        Record a single value.
+
+        Args:
+            value: Non-negative value to record (negative values count as zero)
+        """
+        value = max(value, 0.0)
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        if value <= 1e-9:
+            self.zero_count += 1
+            return
+
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        """Merge the two lowest buckets to stay within the bucket limit."""
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value, or None if nothing was recorded
+        """
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """
+        Summarize the recorded distribution.
+
+        Returns:
+            Dict with count, mean, min, max and common percentiles
+        """
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 4),
+            "min": round(self.min, 4),
+            "max": round(self.max, 4),
+            "p50": round(self.quantile(0.5), 4),
+            "p90": round(self.quantile(0.9), 4),
+            "p99": round(self.quantile(0.99), 4)
+        }
@@ -0,0 +1,128 @@
+"""
+Low-overhead sampling profiler producing flamegraph-compatible collapsed stacks.
+"""
+
+import asyncio
+import logging
+import secrets
+import sys
+import threading
+from collections import Counter
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def profiling_authorized(token: str | None) -> bool:
+    """
+    Check a debug token against the configured profiling token.
+
+    Args:
+        token: Token supplied by the caller
+
+    Returns:
+        True if profiling is enabled and the token matches
+    """
+    if not settings.profiling_enabled or not settings.profiling_token or not token:
+        return False
+    return secrets.compare_digest(token, settings.profiling_token)
+
+
+class SamplingProfiler:
+    """
+    Samples thread stacks from a background thread at a fixed interval.
+
+    Only the sampler thread does work; the profiled code runs unmodified.
+    When a task is given, only samples taken while that asyncio task was
+    running on its event loop are kept, which isolates one request from
+    the others sharing the loop.
+    """
+
+    def __init__(self, interval: float = 0.005, task: asyncio.Task | None = None):
+        """
+        Initialize sampling profiler.
+
+        Args:
+            interval: Seconds between samples
+            task: Optional asyncio task to restrict sampling to
+        """
+        self.interval = interval
+        self.task = task
+        self.samples: Counter[str] = Counter()
+        self._loop = task.get_loop() if task else None
+        self._target_thread = threading.get_ident() if task else None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    @staticmethod
+    def _format_stack(frame) -> str:
+        """Format a frame and its callers as a root-first collapsed stack."""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _sample(self) -> None:
+        """Record the current stack of every profiled thread."""
+        own_thread = threading.get_ident()
+        threads = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            if self.task is not None:
+                if thread_id != self._target_thread or asyncio.current_task(self._loop) is not self.task:
+                    continue
+                self.samples[self._format_stack(frame)] += 1
+            else:
+                thread_name = threads.get(thread_id, str(thread_id))
+                self.samples[f"{thread_name};{self._format_stack(frame)}"] += 1
+
+    def _run(self) -> None:
+        """Sampler thread main loop."""
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception as e:
+                logger.debug(f"Profiler sample failed: {str(e)}")
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> str:
+        """
+        Stop sampling.
+
+        Returns:
+            Collapsed stacks ("frame;frame;frame count" per line)
+        """
+        self._stop.set()
+        self._thread.join()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        """Get the samples as flamegraph-compatible collapsed stacks."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+
+def start_request_profiler(token: str | None) -> SamplingProfiler | None:
+    """
+    Start profiling the current request if a valid profiling token was sent.
+
+    Args:
+        token: Value of the request's profiling header
+
+    Returns:
+        Running profiler restricted to the current task, or None
+    """
+    if not settings.profiling_enabled or not profiling_authorized(token):
+        return None
+    profiler = SamplingProfiler(
+        interval=settings.profiling_interval_ms / 1000,
+        task=asyncio.current_task()
+    )
+    profiler.start()
+    return profiler
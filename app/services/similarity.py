@@ -0,0 +1,307 @@
+"""
+Local near-duplicate question index using hashed character n-grams.
+Runs fully offline with NumPy - no external embedding service.
+"""
+
+import json
+import logging
+import time
+import zlib
+from difflib import SequenceMatcher
+from pathlib import Path
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Chat shorthand expanded before matching ("what r ur hours")
+ABBREVIATIONS = {
+    "r": "are", "u": "you", "ur": "your", "y": "why", "pls": "please", "plz": "please",
+    "thx": "thanks", "wat": "what", "whats": "what", "hrs": "hours", "hr": "hour", "mins": "minutes", "min": "minute"
+}
+
+# Function words ignored for matching; the remaining words carry the meaning
+STOPWORDS = frozenset(
+    "a an the is are am was were be do does did can could will would should shall may might "
+    "i me my we our you your it its they them their he she his her this that these those "
+    "what which there here to of in on at for from by with about "
+    "and or but so if then please tell know want like just any some".split()
+)
+
+# Question words that change what is asked ("how do I pay" vs "when do I pay"); must agree
+QUESTION_WORDS = frozenset("how when where who whom whose why".split())
+
+# Minimum spelling similarity for two content words to count as the same word
+WORD_SIMILARITY = 0.8
+
+# Minimum share of content words (of both questions) with a counterpart in the other question
+MIN_WORD_OVERLAP = 0.6
+
+
+class SimilarityIndex:
+    """
+    Answer cache keyed by question similarity.
+
+    Questions are reduced to their content words (shorthand expanded,
+    function words dropped), split into character n-grams and hashed into a
+    fixed-size feature vector (L2-normalized), so cosine similarity is a
+    single dot product. All vectors live in one preallocated matrix and
+    lookups are vectorized matrix products. Curated entries are pinned;
+    other entries are evicted least-recently-used when the index is full.
+
+    N-gram similarity alone can't tell "monday" from "sunday" or "2" from
+    "20", so a match above the threshold is only used when the numbers and
+    question words (how, when, who, ...) are the same and most content words
+    have a (possibly misspelled) counterpart in the other question.
+    """
+
+    NGRAM_SIZES = (2, 3)
+
+    def __init__(self, capacity: int = 1000, dimensions: int = 4096, threshold: float = 0.6):
+        """
+        Initialize similarity index.
+
+        Args:
+            capacity: Maximum number of stored questions
+            dimensions: Size of the hashed feature vectors
+            threshold: Minimum cosine similarity for a cache hit
+        """
+        self.capacity = capacity
+        self.dimensions = dimensions
+        self.threshold = threshold
+        self.vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        self.pinned = np.zeros(capacity, dtype=bool)
+        self.last_used = np.zeros(capacity, dtype=np.float64)
+        self.questions: list[str | None] = [None] * capacity
+        self.keywords: list[tuple[frozenset[str], frozenset[str], tuple[str, ...]] | None] = [None] * capacity
+        self.answers: list[str | None] = [None] * capacity
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        logger.info(f"Similarity index initialized (capacity: {capacity}, threshold: {threshold})")
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase text, drop punctuation and collapse whitespace."""
+        text = "".join(char if char.isalnum() else " " for char in text.lower())
+        return " ".join(text.split())
+
+    @classmethod
+    def content_words(cls, text: str) -> list[str]:
+        """Normalize text into its content words (all words if it has none)."""
+        words = [ABBREVIATIONS.get(word, word) for word in cls.normalize(text).split()]
+        return [word for word in words if word not in STOPWORDS] or words
+
+    @classmethod
+    def _keywords(cls, text: str) -> tuple[frozenset[str], frozenset[str], tuple[str, ...]]:
+        """Split a text's content words into numbers, question words and other words."""
+        words = cls.content_words(text)
+        numbers = frozenset(word for word in words if any(char.isdigit() for char in word))
+        question_words = QUESTION_WORDS.intersection(words)
+        return numbers, question_words, tuple(
+            word for word in words if word not in numbers and word not in question_words
+        )
+
+    @staticmethod
+    def _matched_words(words: tuple[str, ...], others: tuple[str, ...]) -> int:
+        """Count the words that have a counterpart with a similar spelling."""
+        return sum(
+            word in others or any(SequenceMatcher(None, word, other).ratio() >= WORD_SIMILARITY for other in others)
+            for word in words
+        )
+
+    @classmethod
+    def _word_overlap(cls, words: tuple[str, ...], others: tuple[str, ...]) -> float:
+        """Share of the words of both questions that have a counterpart in the other one."""
+        total = len(words) + len(others)
+        if not total:
+            return 1.0
+        return (cls._matched_words(words, others) + cls._matched_words(others, words)) / total
+
+    def _compatible(self, keywords: tuple[frozenset[str], frozenset[str], tuple[str, ...]], row: int) -> bool:
+        """Check that a query and a stored question agree on numbers, question words and most content words."""
+        numbers, question_words, words = keywords
+        stored_numbers, stored_question_words, stored_words = self.keywords[row]
+        return (
+            numbers == stored_numbers
+            and question_words == stored_question_words
+            and self._word_overlap(words, stored_words) >= MIN_WORD_OVERLAP
+        )
+
+    def _feature_indices(self, text: str) -> list[int]:
+        """Hash the character n-grams of a text's content words into feature indices."""
+        padded = f" {' '.join(self.content_words(text))} "
+        return [
+            zlib.crc32(padded[i:i + n].encode()) % self.dimensions
+            for n in self.NGRAM_SIZES
+            for i in range(len(padded) - n + 1)
+        ]
+
+    def vectorize(self, texts: list[str]) -> np.ndarray:
+        """
+        Convert texts into L2-normalized feature vectors.
+
+        Args:
+            texts: Texts to vectorize
+
+        Returns:
+            Array of shape (len(texts), dimensions)
+        """
+        rows: list[int] = []
+        cols: list[int] = []
+        for row, text in enumerate(texts):
+            indices = self._feature_indices(text)
+            rows.extend([row] * len(indices))
+            cols.extend(indices)
+
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(matrix, (rows, cols), 1.0)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def _best_matches(self, texts: list[str], queries: np.ndarray) -> list[int | None]:
+        """Find the most similar compatible stored question for each query (None if below threshold)."""
+        scores = queries @ self.vectors[:self.size].T
+        matches: list[int | None] = []
+        for text, row_scores in zip(texts, scores):
+            candidates = np.flatnonzero(row_scores >= self.threshold)
+            match = None
+            if len(candidates):
+                keywords = self._keywords(text)
+                for row in candidates[np.argsort(-row_scores[candidates])].tolist():
+                    if self._compatible(keywords, row):
+                        match = row
+                        break
+            matches.append(match)
+        return matches
+
+    def lookup_many(self, texts: list[str]) -> list[str | None]:
+        """
+        Look up cached answers for several questions at once.
+
+        Args:
+            texts: Questions to look up
+
+        Returns:
+            Cached answer per question, or None where nothing is similar enough
+        """
+        if self.size == 0 or not texts:
+            self.misses += len(texts)
+            return [None] * len(texts)
+
+        matches = self._best_matches(texts, self.vectorize(texts))
+        now = time.monotonic()
+        results: list[str | None] = []
+        for row in matches:
+            if row is not None:
+                self.hits += 1
+                self.last_used[row] = now
+                results.append(self.answers[row])
+            else:
+                self.misses += 1
+                results.append(None)
+        return results
+
+    def lookup(self, text: str) -> str | None:
+        """
+        Look up a cached answer for a question.
+
+        Args:
+            text: Question to look up
+
+        Returns:
+            Cached answer, or None if nothing is similar enough
+        """
+        return self.lookup_many([text])[0]
+
+    def add(self, question: str, answer: str, curated: bool = False) -> bool:
+        """
+        Store an answer for a question.
+
+        A near-duplicate of an existing question replaces its answer, unless the
+        existing entry is curated and the new one is not.
+
+        Args:
+            question: Question text
+            answer: Answer to reuse for similar questions
+            curated: Whether the entry is operator-curated (never evicted)
+
+        Returns:
+            True if stored, False if skipped
+        """
+        if not self.normalize(question):
+            return False
+        vector = self.vectorize([question])
+
+        row = self._best_matches([question], vector)[0] if self.size else None
+        if row is not None and self.pinned[row] and not curated:
+            return False
+
+        if row is None:
+            row = self._free_row()
+            if row is None:
+                return False
+
+        self.vectors[row] = vector[0]
+        self.questions[row] = question
+        self.keywords[row] = self._keywords(question)
+        self.answers[row] = answer
+        self.pinned[row] = curated
+        self.last_used[row] = time.monotonic()
+        return True
+
+    def _free_row(self) -> int | None:
+        """Get an empty row, evicting the least recently used unpinned entry if full."""
+        if self.size < self.capacity:
+            self.size += 1
+            return self.size - 1
+
+        candidates = np.where(self.pinned, np.inf, self.last_used)
+        row = int(candidates.argmin())
+        if self.pinned[row]:
+            # Index is full of curated entries
+            return None
+        self.evictions += 1
+        return row
+
+    def load_curated(self, path: str) -> int:
+        """
+        Load operator-curated answers from a JSONL file.
+
+        Each line is an object with "question" and "answer" keys.
+
+        Args:
+            path: Path to the JSONL file
+
+        Returns:
+            Number of curated entries loaded
+        """
+        loaded = 0
+        with Path(path).open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if self.add(entry["question"], entry["answer"], curated=True):
+                    loaded += 1
+        logger.info(f"Loaded {loaded} curated answers from {path}")
+        return loaded
+
+    def get_stats(self) -> dict:
+        """
+        Get index statistics.
+
+        Returns:
+            Dict with size, curated count and hit/miss counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": self.size,
+            "capacity": self.capacity,
+            "curated": int(self.pinned[:self.size].sum()),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,377 @@
+"""
+Token and cost accounting per conversation and globally, with daily budgets.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from app.config import settings
+from app.models.messages import GenerationResult
+
+logger = logging.getLogger(__name__)
+
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICING: dict[str, tuple[float, float, float]] = {
+    "llama-3.3-70b-versatile": (0.59, 0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.05, 0.08),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "claude-3-5-sonnet": (3.00, 0.30, 15.00),
+    "claude-3-5-haiku": (0.80, 0.08, 4.00)
+}
+
+
+def estimate_cost(result: GenerationResult) -> float:
+    """
+    Estimate the cost of a provider call.
+
+    Models are matched by prefix, so dated snapshots (e.g. "gpt-4o-mini-2024-07-18")
+    use the price of their base model. Unknown models cost 0.
+
+    Args:
+        result: Provider generation result
+
+    Returns:
+        Estimated cost in USD
+    """
+    pricing = MODEL_PRICING.get(result.model)
+    if pricing is None:
+        for model, model_pricing in MODEL_PRICING.items():
+            if result.model.startswith(model):
+                pricing = model_pricing
+                break
+        else:
+            return 0.0
+
+    input_price, cached_price, output_price = pricing
+    uncached = max(result.input_tokens - result.cached_tokens, 0)
+    return (
+        uncached * input_price
+        + result.cached_tokens * cached_price
+        + result.output_tokens * output_price
+    ) / 1_000_000
+
+
+class RollingWindow:
+    """
+    Sums of several values over a sliding time window.
+
+    The window is split into fixed time buckets stored in a ring, so adding a
+    sample is O(1) and reading the totals is O(number of buckets).
+    """
+
+    __slots__ = ("bucket_seconds", "buckets", "fields", "epochs", "values")
+
+    def __init__(self, window_seconds: float, buckets: int, fields: int):
+        """
+        Initialize rolling window.
+
+        Args:
+            window_seconds: Length of the window
+            buckets: Number of time buckets the window is split into
+            fields: Number of values summed per sample
+        """
+        self.bucket_seconds = window_seconds / buckets
+        self.buckets = buckets
+        self.fields = fields
+        self.epochs = array("q", [-1] * buckets)
+        self.values = array("d", [0.0] * (buckets * fields))
+
+    def add(self, now: float, *values: float) -> None:
+        """Add a sample (one value per field) at the given time."""
+        epoch = int(now // self.bucket_seconds)
+        slot = epoch % self.buckets
+        offset = slot * self.fields
+
+        # Reuse a stale bucket from a previous lap of the ring
+        if self.epochs[slot] != epoch:
+            self.epochs[slot] = epoch
+            for i in range(self.fields):
+                self.values[offset + i] = 0.0
+
+        for i, value in enumerate(values):
+            self.values[offset + i] += value
+
+    def totals(self, now: float) -> list[float]:
+        """Get the per-field sums of all samples inside the window."""
+        oldest = int(now // self.bucket_seconds) - self.buckets + 1
+        totals = [0.0] * self.fields
+        for slot in range(self.buckets):
+            if self.epochs[slot] >= oldest:
+                offset = slot * self.fields
+                for i in range(self.fields):
+                    totals[i] += self.values[offset + i]
+        return totals
+
+
+class _UserUsage:
+    """
+    Usage counters of a single conversation.
+
+    Tokens of the last 24 hours use a sliding-window counter: today's tokens
+    plus yesterday's, weighted by the part of yesterday still inside the
+    window. It's an estimate, but needs three numbers instead of a bucket
+    ring per user.
+    """
+
+    __slots__ = (
+        "input_tokens", "output_tokens", "cached_tokens", "requests", "cost_usd",
+        "day", "tokens_today", "tokens_yesterday"
+    )
+
+    DAY_SECONDS = 86400
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.requests = 0
+        self.cost_usd = 0.0
+        self.day = 0
+        self.tokens_today = 0
+        self.tokens_yesterday = 0
+
+    def _roll(self, now: float) -> None:
+        """Move the counters forward to the current day."""
+        day = int(now // self.DAY_SECONDS)
+        if day != self.day:
+            self.tokens_yesterday = self.tokens_today if day == self.day + 1 else 0
+            self.tokens_today = 0
+            self.day = day
+
+    def add_tokens(self, now: float, tokens: int) -> None:
+        """Count tokens used at the given time."""
+        self._roll(now)
+        self.tokens_today += tokens
+
+    def tokens_last_24h(self, now: float) -> float:
+        """Estimate the tokens used in the last 24 hours."""
+        day = int(now // self.DAY_SECONDS)
+        if day == self.day:
+            today, yesterday = self.tokens_today, self.tokens_yesterday
+        elif day == self.day + 1:
+            today, yesterday = 0, self.tokens_today
+        else:
+            return 0.0
+        return today + yesterday * (1 - (now % self.DAY_SECONDS) / self.DAY_SECONDS)
+
+
+class UsageTracker:
+    """
+    Aggregates provider usage per phone number and globally.
+
+    The heaviest conversations are tracked incrementally as a bounded set of
+    candidates (a conversation joins when its 24h tokens exceed the lightest
+    candidate's), so reporting them never scans every tracked conversation.
+    Candidates sit in a min-heap keyed by their 24h tokens when last checked;
+    since those counts decay, the lightest entry is re-checked before each
+    comparison and pushed back down if its key was out of date.
+    """
+
+    # Heaviest conversations kept for the top-users report
+    TOP_CANDIDATES = 100
+
+    # Fields of the global rolling windows
+    FIELDS = ("input_tokens", "output_tokens", "cached_tokens", "cost_usd", "requests", "latency_ms")
+
+    def __init__(self, max_users: int = 100000, daily_token_budget: int = 0, global_daily_token_budget: int = 0):
+        """
+        Initialize usage tracker.
+
+        Args:
+            max_users: Maximum number of conversations tracked (least recently active are dropped)
+            daily_token_budget: Tokens per conversation per 24h before degrading (0 = unlimited)
+            global_daily_token_budget: Tokens across all conversations per 24h before degrading (0 = unlimited)
+        """
+        self.max_users = max_users
+        self.daily_token_budget = daily_token_budget
+        self.global_daily_token_budget = global_daily_token_budget
+        self.users: OrderedDict[str, _UserUsage] = OrderedDict()
+        self.totals = _UserUsage()
+        self.hourly = RollingWindow(3600, 60, len(self.FIELDS))
+        self.daily = RollingWindow(86400, 24, len(self.FIELDS))
+        self._top: dict[str, _UserUsage] = {}
+        self._top_heap: list[tuple[float, str]] = []  # (24h tokens when last checked, phone number)
+        self._lock = threading.Lock()
+        logger.info(f"Usage tracker initialized (daily budget per user: {daily_token_budget or 'unlimited'})")
+
+    def record(self, phone_number: str, result: GenerationResult) -> None:
+        """
+        Record the usage of a provider call.
+
+        Args:
+            phone_number: User's phone number (conversation ID)
+            result: Provider generation result
+        """
+        now = time.time()
+        cost = estimate_cost(result)
+        tokens = result.input_tokens + result.output_tokens
+
+        with self._lock:
+            user = self.users.get(phone_number)
+            if user is None:
+                user = self.users[phone_number] = _UserUsage()
+                if len(self.users) > self.max_users:
+                    evicted, _ = self.users.popitem(last=False)
+                    if self._top.pop(evicted, None) is not None and len(self._top_heap) > 2 * self.TOP_CANDIDATES:
+                        self._top_heap = [(usage.tokens_last_24h(now), number) for number, usage in self._top.items()]
+                        heapq.heapify(self._top_heap)
+            else:
+                self.users.move_to_end(phone_number)
+
+            for usage in (user, self.totals):
+                usage.input_tokens += result.input_tokens
+                usage.output_tokens += result.output_tokens
+                usage.cached_tokens += result.cached_tokens
+                usage.requests += 1
+                usage.cost_usd += cost
+            user.add_tokens(now, tokens)
+            self._update_top(phone_number, user, now)
+
+            sample = (result.input_tokens, result.output_tokens, result.cached_tokens, cost, 1, result.latency_ms)
+            self.hourly.add(now, *sample)
+            self.daily.add(now, *sample)
+
+    def _update_top(self, phone_number: str, user: _UserUsage, now: float) -> None:
+        """Add a conversation to the top candidates if it outweighs the lightest one (lock held)."""
+        if phone_number in self._top:
+            return
+        tokens = user.tokens_last_24h(now)
+        if len(self._top) < self.TOP_CANDIDATES:
+            self._top[phone_number] = user
+            heapq.heappush(self._top_heap, (tokens, phone_number))
+            return
+
+        # Refresh the lightest entry until its key is current (dropping entries of evicted conversations)
+        while True:
+            key, lightest = self._top_heap[0]
+            candidate = self._top.get(lightest)
+            if candidate is None:
+                heapq.heappop(self._top_heap)
+                continue
+            current = candidate.tokens_last_24h(now)
+            if current == key:
+                break
+            heapq.heapreplace(self._top_heap, (current, lightest))
+
+        if tokens > current:
+            heapq.heapreplace(self._top_heap, (tokens, phone_number))
+            del self._top[lightest]
+            self._top[phone_number] = user
+
+    def over_budget(self, phone_number: str) -> bool:
+        """
+        Check whether a conversation (or the whole bot) exceeded its daily token budget.
+
+        Args:
+            phone_number: User's phone number
+
+        Returns:
+            True if replies should be degraded to save tokens
+        """
+        now = time.time()
+        with self._lock:
+            if self.global_daily_token_budget:
+                if self._daily_tokens(now) >= self.global_daily_token_budget:
+                    return True
+
+            if self.daily_token_budget:
+                user = self.users.get(phone_number)
+                if user and user.tokens_last_24h(now) >= self.daily_token_budget:
+                    return True
+
+        return False
+
+    def _daily_tokens(self, now: float) -> float:
+        """Tokens used across all conversations in the last 24 hours."""
+        totals = self.daily.totals(now)
+        return totals[0] + totals[1]
+
+    @staticmethod
+    def _user_summary(user: _UserUsage, tokens_last_24h: float) -> dict:
+        """Summarize the counters of one conversation."""
+        return {
+            "requests": user.requests,
+            "input_tokens": user.input_tokens,
+            "output_tokens": user.output_tokens,
+            "cached_tokens": user.cached_tokens,
+            "cost_usd": round(user.cost_usd, 6),
+            "tokens_last_24h": int(tokens_last_24h)
+        }
+
+    def _window_summary(self, window: RollingWindow, now: float) -> dict:
+        """Summarize a global rolling window."""
+        totals = dict(zip(self.FIELDS, window.totals(now)))
+        requests = totals["requests"]
+        return {
+            "requests": int(requests),
+            "input_tokens": int(totals["input_tokens"]),
+            "output_tokens": int(totals["output_tokens"]),
+            "cached_tokens": int(totals["cached_tokens"]),
+            "cost_usd": round(totals["cost_usd"], 6),
+            "avg_latency_ms": round(totals["latency_ms"] / requests, 1) if requests else 0.0
+        }
+
+    def get_user_stats(self, phone_number: str) -> dict | None:
+        """
+        Get usage of a single conversation.
+
+        Args:
+            phone_number: User's phone number
+
+        Returns:
+            Usage summary, or None if the conversation is not tracked
+        """
+        with self._lock:
+            user = self.users.get(phone_number)
+            if user is None:
+                return None
+            now = time.time()
+            summary = self._user_summary(user, user.tokens_last_24h(now))
+        summary["over_budget"] = self.over_budget(phone_number)
+        return summary
+
+    def get_stats(self, top: int = 10) -> dict:
+        """
+        Get global usage and the heaviest conversations of the last 24 hours.
+
+        Args:
+            top: Number of heaviest conversations to include (at most TOP_CANDIDATES)
+
+        Returns:
+            Dict with lifetime totals, rolling windows and top users
+        """
+        now = time.time()
+        with self._lock:
+            ranked = sorted(
+                ((tokens, phone_number, user) for phone_number, user in self._top.items()
+                 if (tokens := user.tokens_last_24h(now)) > 0),
+                key=lambda item: item[0],
+                reverse=True
+            )
+
+            return {
+                "total": self._user_summary(self.totals, self._daily_tokens(now)),
+                "last_hour": self._window_summary(self.hourly, now),
+                "last_24h": self._window_summary(self.daily, now),
+                "tracked_users": len(self.users),
+                "budgets": {
+                    "daily_tokens_per_user": self.daily_token_budget or None,
+                    "daily_tokens_global": self.global_daily_token_budget or None
+                },
+                "top_users_24h": {
+                    phone_number: self._user_summary(user, tokens)
+                    for tokens, phone_number, user in ranked[:top]
+                }
+            }
+
+
+# Global usage tracker instance
+usage_tracker = UsageTracker(
+    max_users=settings.usage_max_tracked_users,
+    daily_token_budget=settings.daily_token_budget_per_user,
+    global_daily_token_budget=settings.daily_token_budget_global
+)
@@ -5,25 +5,53 @@ WhatsApp Business API service for sending messages.
 import logging
 import httpx
 from app.config import settings
-from app.models.messages import TextMessage
+from app.models.messages import TextMessage, TemplateMessage
+from app.services.http import create_http_client
 
 logger = logging.getLogger(__name__)
 
 
+class WhatsAppAPIError(Exception):
+    """Error response from the WhatsApp Business API."""
+
+    def __init__(self, message: str, status_code: int | None = None, error_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.error_code = error_code
+
+
 class WhatsAppService:
     """Service for interacting with WhatsApp Business API."""
 
-    def __init__(self):
-        """Initialize WhatsApp service."""
-        self.base_url = settings.whatsapp_api_base_url
+    def __init__(self, base_url: str | None = None):
+        """
+        Initialize WhatsApp service.
+
+        Args:
+            base_url: Optional API base URL override (e.g. a local fake Graph API)
+        """
+        self.base_url = base_url or settings.whatsapp_api_base_url
         self.phone_number_id = settings.whatsapp_phone_number_id
         self.token = settings.whatsapp_token
         self.headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
+        self._client: httpx.AsyncClient | None = None
         logger.info("WhatsApp service initialized")
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client, creating it on first use."""
+        if self._client is None:
+            self._client = create_http_client()
+        return self._client
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     async def send_text_message(self, to: str, message: str) -> dict:
         """
         Send a text message via WhatsApp.
@@ -47,19 +75,18 @@ class WhatsAppService:
         )
 
         try:
-            async with httpx.AsyncClient() as client:
-                logger.info(f"Sending WhatsApp message to {to}: {message[:50]}...")
-                response = await client.post(
-                    url,
-                    headers=self.headers,
-                    json=payload.model_dump(),
-                    timeout=30.0
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(f"Message sent successfully: {result}")
-                return result
+            logger.info(f"Sending WhatsApp message to {to}: {message[:50]}...")
+            response = await self._get_client().post(
+                url,
+                headers=self.headers,
+                json=payload.model_dump(),
+                timeout=30.0
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(f"Message sent successfully: {result}")
+            return result
 
         except httpx.HTTPStatusError as e:
             logger.error(f"WhatsApp API error: {e.response.status_code} - {e.response.text}")
@@ -68,6 +95,61 @@ class WhatsAppService:
             logger.error(f"Error sending WhatsApp message: {str(e)}")
             raise Exception(f"Failed to send WhatsApp message: {str(e)}")
 
+    async def send_template_message(
+        self,
+        to: str,
+        template_name: str,
+        language_code: str = "en_US",
+        parameters: list[str] | None = None
+    ) -> dict:
+        """
+        Send a template message via WhatsApp.
+
+        Args:
+            to: Recipient's phone number
+            template_name: Name of an approved message template
+            language_code: Template language code
+            parameters: Optional body parameters, in template order
+
+        Returns:
+            API response as dict
+
+        Raises:
+            WhatsAppAPIError: If the API call fails
+        """
+        url = f"{self.base_url}/{self.phone_number_id}/messages"
+
+        template = {"name": template_name, "language": {"code": language_code}}
+        if parameters:
+            template["components"] = [{
+                "type": "body",
+                "parameters": [{"type": "text", "text": value} for value in parameters]
+            }]
+        payload = TemplateMessage(to=to, template=template)
+
+        try:
+            response = await self._get_client().post(
+                url,
+                headers=self.headers,
+                json=payload.model_dump(),
+                timeout=30.0
+            )
+        except httpx.HTTPError as e:
+            raise WhatsAppAPIError(f"Failed to send template message: {str(e)}")
+
+        if response.is_error:
+            try:
+                error_code = response.json().get("error", {}).get("code")
+            except ValueError:
+                error_code = None
+            raise WhatsAppAPIError(
+                f"Failed to send template message: {response.text}",
+                status_code=response.status_code,
+                error_code=error_code
+            )
+
+        return response.json()
+
     async def mark_message_as_read(self, message_id: str) -> dict:
         """
         Mark a message as read.
@@ -87,17 +169,16 @@ class WhatsAppService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                result = response.json()
-                logger.debug(f"Message {message_id} marked as read")
-                return result
+            response = await self._get_client().post(
+                url,
+                headers=self.headers,
+                json=payload,
+                timeout=30.0
+            )
+            response.raise_for_status()
+            result = response.json()
+            logger.debug(f"Message {message_id} marked as read")
+            return result
 
         except Exception as e:
             logger.warning(f"Failed to mark message as read: {str(e)}")
@@ -0,0 +1,120 @@
+"""
+Microbenchmarks: conversation history store and per-turn payload construction
+Times ConversationManager at 1k and 1M conversations, and compares the
+previous approach (Pydantic history rebuilt into new dicts on every call)
+with the incrementally maintained provider-native history.
+
+Runs offline: no provider is called, only the payload is built.
+
+Usage:
+    pytest benchmarks/bench_conversation.py
+"""
+
+import itertools
+from functools import cache
+import pytest
+from app.models.messages import ChatMessage as PydanticChatMessage
+from app.services.ai import ConversationManager
+from app.services.ai.base import AIProvider
+
+SYSTEM_PROMPT = AIProvider.SYSTEM_PROMPT
+MAX_HISTORY = 10
+USER_TEXT = "Hi! Could you tell me what your opening hours are on weekends?"
+ASSISTANT_TEXT = "Sure! We're open from 10am to 4pm on Saturdays and closed on Sundays."
+
+SCALES = {"1k": 1_000, "1M": 1_000_000}
+
+
+@cache
+def populated_manager(conversations: int) -> ConversationManager:
+    """A manager holding one user/assistant exchange per conversation (shared across benchmarks)."""
+    manager = ConversationManager(MAX_HISTORY)
+    for index in range(conversations):
+        phone_number = f"90555{index:07d}"
+        manager.add_message(phone_number, "user", USER_TEXT)
+        manager.add_message(phone_number, "assistant", ASSISTANT_TEXT)
+    return manager
+
+
+@pytest.mark.benchmark(group="conversation")
+@pytest.mark.parametrize("conversations", SCALES.values(), ids=SCALES.keys())
+def test_add_message(benchmark, conversations: int):
+    """Append to existing conversations, cycling through all of them."""
+    manager = populated_manager(conversations)
+    phone_numbers = itertools.cycle(list(manager.conversations))
+    benchmark(lambda: manager.add_message(next(phone_numbers), "user", USER_TEXT))
+
+
+@pytest.mark.benchmark(group="conversation")
+@pytest.mark.parametrize("conversations", SCALES.values(), ids=SCALES.keys())
+def test_get_history(benchmark, conversations: int):
+    """Look up the history of existing conversations, cycling through all of them."""
+    manager = populated_manager(conversations)
+    phone_numbers = itertools.cycle(list(manager.conversations))
+    benchmark(lambda: manager.get_history(next(phone_numbers)))
+
+
+@pytest.mark.benchmark(group="conversation")
+def test_populate_1k_conversations(benchmark, peak_memory):
+    """Create 1k conversations with one exchange each (peak memory = store footprint)."""
+    populate = lambda: populated_manager.__wrapped__(1_000)
+    benchmark(populate)
+    peak_memory(populate)
+
+
+class LegacyConversationManager:
+    """The previous history store: Pydantic messages, re-sliced on every append."""
+
+    def __init__(self, max_history: int):
+        self.conversations: dict[str, list[PydanticChatMessage]] = {}
+        self.max_history = max_history
+
+    def add_message(self, phone_number: str, role: str, content: str) -> None:
+        if phone_number not in self.conversations:
+            self.conversations[phone_number] = []
+        self.conversations[phone_number].append(PydanticChatMessage(role=role, content=content))
+        if len(self.conversations[phone_number]) > self.max_history:
+            self.conversations[phone_number] = self.conversations[phone_number][-self.max_history:]
+
+    def get_history(self, phone_number: str) -> list[PydanticChatMessage]:
+        return self.conversations.get(phone_number, [])
+
+
+def legacy_payload(user_message: str, history: list[PydanticChatMessage]) -> list[dict]:
+    """The previous OpenAI/Groq payload construction."""
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    for msg in history:
+        messages.append({"role": msg.role, "content": msg.content})
+    messages.append({"role": "user", "content": user_message})
+    return messages
+
+
+def incremental_payload(user_message: str, history) -> list[dict]:
+    """The current OpenAI/Groq payload construction."""
+    return [AIProvider.SYSTEM_MESSAGE, *history, {"role": "user", "content": user_message}]
+
+
+APPROACHES = {
+    "legacy": (LegacyConversationManager, legacy_payload),
+    "incremental": (ConversationManager, incremental_payload)
+}
+
+
+@pytest.mark.benchmark(group="payload")
+@pytest.mark.parametrize("approach", APPROACHES.values(), ids=APPROACHES.keys())
+def test_conversation_turn(benchmark, peak_memory, approach):
+    """One turn with a full history: build the payload, then store both messages."""
+    manager_class, build_payload = approach
+    manager = manager_class(MAX_HISTORY)
+
+    def turn():
+        payload = build_payload(USER_TEXT, manager.get_history("+1234567890"))
+        manager.add_message("+1234567890", "user", USER_TEXT)
+        manager.add_message("+1234567890", "assistant", ASSISTANT_TEXT)
+        return payload
+
+    for _ in range(MAX_HISTORY):
+        turn()  # fill history
+    benchmark(turn)
+    history = manager.get_history("+1234567890")
+    peak_memory(lambda: build_payload(USER_TEXT, history))
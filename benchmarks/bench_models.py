@@ -0,0 +1,100 @@
+"""
+Microbenchmarks: webhook payload parsing and outbound message serialization
+Uses realistic WhatsApp Cloud API payloads; nothing is sent.
+
+Usage:
+    pytest benchmarks/bench_models.py
+"""
+
+import json
+import pytest
+from app.models.messages import TextMessage, WebhookPayload
+
+
+def _webhook(value: dict) -> bytes:
+    """Wrap a change value in the webhook envelope Meta sends."""
+    return json.dumps({
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": "102290129340398",
+            "changes": [{"value": value, "field": "messages"}]
+        }]
+    }).encode()
+
+
+METADATA = {"display_phone_number": "15550783881", "phone_number_id": "106540352242922"}
+
+TEXT_PAYLOAD = _webhook({
+    "messaging_product": "whatsapp",
+    "metadata": METADATA,
+    "contacts": [{"profile": {"name": "Ayse Yilmaz"}, "wa_id": "905551234567"}],
+    "messages": [{
+        "from": "905551234567",
+        "id": "wamid.HBgMOTA1NTUxMjM0NTY3FQIAEhggQTRBNjU3RjEyRDkxNEIzQUE2NUIxQjY5Q0U2QTVBRkMA",
+        "timestamp": "1718000000",
+        "text": {"body": "Hi! Could you tell me what your opening hours are on weekends?"},
+        "type": "text"
+    }]
+})
+
+
+def _status(index: int, status: str) -> dict:
+    """One delivery status update."""
+    return {
+        "id": f"wamid.HBgMOTA1NTUxMjM0NTY3FQIAERgSMEM5QjQ2NTVBNzQ4{index:06d}AA==",
+        "status": status,
+        "timestamp": "1718000005",
+        "recipient_id": "905551234567",
+        "conversation": {
+            "id": "2d6b1a2f0c4e8a9b7c3d5e1f0a2b4c6d",
+            "expiration_timestamp": "1718086400",
+            "origin": {"type": "service"}
+        },
+        "pricing": {"billable": True, "pricing_model": "CBP", "category": "service"}
+    }
+
+
+STATUS_PAYLOAD = _webhook({
+    "messaging_product": "whatsapp",
+    "metadata": METADATA,
+    "statuses": [_status(0, "delivered")]
+})
+
+# Meta batches status updates during broadcasts
+STATUS_BATCH_PAYLOAD = _webhook({
+    "messaging_product": "whatsapp",
+    "metadata": METADATA,
+    "statuses": [_status(index, ("sent", "delivered", "read")[index % 3]) for index in range(50)]
+})
+
+
+PAYLOADS = {"text": TEXT_PAYLOAD, "status": STATUS_PAYLOAD, "status_batch_50": STATUS_BATCH_PAYLOAD}
+
+
+@pytest.mark.benchmark(group="webhook")
+@pytest.mark.parametrize("raw", PAYLOADS.values(), ids=PAYLOADS.keys())
+def test_parse_webhook(benchmark, peak_memory, raw: bytes):
+    """Decode and validate a webhook body the way the /webhook handler does."""
+    parse = lambda: WebhookPayload(**json.loads(raw))
+    benchmark(parse)
+    peak_memory(parse)
+
+
+@pytest.mark.benchmark(group="serialization")
+def test_text_message_model_dump(benchmark, peak_memory):
+    """Serialize an outbound text message for the Graph API."""
+    message = TextMessage(
+        to="905551234567",
+        text={"body": "Sure! We're open from 10am to 4pm on Saturdays and closed on Sundays."}
+    )
+    benchmark(message.model_dump)
+    peak_memory(message.model_dump)
+
+
+@pytest.mark.benchmark(group="serialization")
+def test_text_message_build_and_dump(benchmark, peak_memory):
+    """Build and serialize an outbound text message (per-send cost in WhatsAppService)."""
+    body = "Sure! We're open from 10am to 4pm on Saturdays and closed on Sundays."
+    build = lambda: TextMessage(to="905551234567", text={"body": body}).model_dump()
+    benchmark(build)
+    peak_memory(build)
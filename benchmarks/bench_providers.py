@@ -0,0 +1,33 @@
+"""
+Microbenchmarks: provider message-array construction
+Builds the request payload of every provider class from a full history;
+the SDK clients are created but never called.
+
+Usage:
+    pytest benchmarks/bench_providers.py
+"""
+
+import pytest
+from app.services.ai import ConversationManager
+from app.services.ai.claude import ClaudeProvider
+from app.services.ai.groq import GroqProvider
+from app.services.ai.openai import OpenAIProvider
+
+USER_TEXT = "Hi! Could you tell me what your opening hours are on weekends?"
+ASSISTANT_TEXT = "Sure! We're open from 10am to 4pm on Saturdays and closed on Sundays."
+PROVIDERS = {"groq": GroqProvider, "openai": OpenAIProvider, "claude": ClaudeProvider}
+
+
+@pytest.mark.benchmark(group="providers")
+@pytest.mark.parametrize("provider_class", PROVIDERS.values(), ids=PROVIDERS.keys())
+def test_build_messages(benchmark, peak_memory, provider_class):
+    """Build one request's messages array with a full (10 message) history."""
+    provider = provider_class(api_key="benchmark")
+    manager = ConversationManager(max_history=10)
+    for _ in range(5):
+        manager.add_message("905551234567", "user", USER_TEXT)
+        manager.add_message("905551234567", "assistant", ASSISTANT_TEXT)
+    history = manager.get_history("905551234567")
+    build = lambda: provider.build_messages(USER_TEXT, history)
+    benchmark(build)
+    peak_memory(build)
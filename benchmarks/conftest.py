@@ -0,0 +1,58 @@
+"""
+Shared setup for the offline microbenchmark suite (pytest-benchmark).
+
+Puts the project root on sys.path and provides dummy settings, so app modules
+can be imported without a .env file, and adds the peak_memory fixture, which
+records the memory one call allocates next to pytest-benchmark's timings.
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+import pytest
+
+# Add project root to path and provide dummy settings (nothing is sent)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+for name in ("WHATSAPP_TOKEN", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_VERIFY_TOKEN",
+             "GROQ_API_KEY", "OPENAI_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "warning")
+
+_peak_memory_results = pytest.StashKey[dict[str, int]]()
+
+
+@pytest.fixture
+def peak_memory(benchmark, request) -> Callable[[Callable[[], Any]], None]:
+    """
+    Measure the peak bytes allocated by one call (retained results included).
+
+    The value is stored in the benchmark's extra_info, so it is saved with
+    --benchmark-save, and listed after the timing table.
+    """
+    def measure(func: Callable[[], Any]) -> None:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            result = func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del result
+        size = max(peak - baseline, 0)
+        benchmark.extra_info["peak_memory"] = size
+        request.config.stash.setdefault(_peak_memory_results, {})[request.node.name] = size
+    return measure
+
+
+def pytest_terminal_summary(terminalreporter, config) -> None:
+    """List the peak memory of every benchmark."""
+    results = config.stash.get(_peak_memory_results, {})
+    if not results:
+        return
+    terminalreporter.section("peak memory per call")
+    for name, size in sorted(results.items()):
+        terminalreporter.write_line(f"{name:<50}{size / 1024:>10.1f} KiB")
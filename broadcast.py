@@ -0,0 +1,91 @@
+"""
+Broadcast CLI - WhatsApp AI Chatbot
+Send an approved template message to a list of opted-in users.
+
+Recipients are streamed from CSV ("to" column + template parameters) or
+JSONL ({"to": ..., "parameters": [...]}), so lists of any size run in
+constant memory. Use --checkpoint to resume an interrupted run.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add app directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.whatsapp import WhatsAppService
+from app.services.broadcast import BroadcastRunner, iter_recipients
+
+
+async def broadcast(args: argparse.Namespace) -> None:
+    """Run a broadcast and print its report."""
+    whatsapp = WhatsAppService(base_url=args.base_url)
+    try:
+        runner = BroadcastRunner(
+            whatsapp=whatsapp,
+            template_name=args.template,
+            language_code=args.language,
+            concurrency=args.concurrency,
+            rate_limit=args.rate,
+            max_retries=args.max_retries,
+            checkpoint_path=args.checkpoint,
+            recipients_path=args.recipients
+        )
+    except ValueError as e:
+        await whatsapp.close()
+        sys.exit(f"❌ {e}")
+
+    print("=" * 70)
+    print(f"📣 Broadcasting template '{args.template}' ({args.language}) from {args.recipients}")
+    print(f"   Concurrency: {args.concurrency}  Rate limit: {args.rate} msg/s")
+    if args.base_url:
+        print(f"   Graph API base URL: {args.base_url}")
+    print("=" * 70)
+
+    try:
+        report = await runner.run(iter_recipients(args.recipients))
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    finally:
+        await whatsapp.close()
+
+    print(f"✅ Sent: {report['sent']}  ❌ Failed: {report['failed']}  "
+          f"⏭️  Skipped (already done): {report['skipped_from_checkpoint']}")
+    print(f"⚡ Throughput: {report['messages_per_second']} msg/s over {report['duration_seconds']}s "
+          f"({report['retries']} retries)")
+    for code, count in report["failures_by_code"].items():
+        print(f"   ❌ Error {code}: {count}")
+    if args.checkpoint and report["failed"]:
+        print(f"📝 Failed recipients: {args.checkpoint}.failures.jsonl")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json_path}")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Send a WhatsApp template message to many recipients")
+    parser.add_argument("recipients", help="CSV or JSONL file of recipients")
+    parser.add_argument("--template", required=True, help="Approved template name")
+    parser.add_argument("--language", default="en_US", help="Template language code")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum sends in flight")
+    parser.add_argument("--rate", type=float, default=80.0, help="Maximum messages per second (phone number throughput)")
+    parser.add_argument("--max-retries", type=int, default=3, help="Retries for rate-limited or temporary failures")
+    parser.add_argument("--checkpoint", help="Checkpoint file to resume an interrupted run")
+    parser.add_argument("--base-url", help="Graph API base URL, e.g. http://127.0.0.1:9100/v18.0 for fake_graph_api.py")
+    parser.add_argument("--json", dest="json_path", help="Write the report to this JSON file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    try:
+        asyncio.run(broadcast(parse_args()))
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted - run again with the same --checkpoint to resume")
@@ -1,16 +1,28 @@
 """
 Terminal-based Interactive Chat - WhatsApp AI Chatbot
 Test the AI chatbot directly from your terminal without WhatsApp
+
+Also provides a batch mode that replays multi-turn conversations from a
+JSONL file concurrently and reports latency and throughput per provider.
 """
 
+import argparse
 import asyncio
+import contextvars
+import json
 import sys
+import time
 from pathlib import Path
 
 # Add app directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.services.ai import ai_service
+from app.config import settings
+from app.services.ai import ai_service, AIService, AIProviderFactory
+from app.services.metrics import QuantileSketch
+
+# Timing of the turn being processed by the current task (read by the HTTP hook)
+_turn_timing: contextvars.ContextVar[dict | None] = contextvars.ContextVar("turn_timing", default=None)
 
 
 async def interactive_chat():
@@ -50,11 +62,13 @@ async def interactive_chat():
                 print(f"📊 Total messages: {message_count}")
                 break
 
-            # Check for clear history command
-            if user_message.lower() in ['clear', 'reset']:
-                ai_service.conversation_manager.clear_history(user_phone)
-                print("✅ Conversation history cleared!")
-                message_count = 0
+            # Commands and menu picks (e.g. 'clear', 'reset') are answered without the LLM
+            routed = ai_service.route_intent(user_phone, user_message)
+            if routed is not None:
+                intent, intent_reply = routed
+                if intent.action == "clear_history":
+                    message_count = 0
+                print(f"🤖 Bot: {intent_reply}")
                 continue
 
             # Process message with AI
@@ -85,7 +99,193 @@ async def interactive_chat():
         print(f"\n📝 Conversation history: {len(history)} messages")
 
 
+class BatchStats:
+    """Latency, throughput and error statistics for one provider/model."""
+
+    def __init__(self):
+        self.headers = QuantileSketch()
+        self.total = QuantileSketch()
+        self.turns = 0
+        self.errors: dict[str, int] = {}
+        self.output_tokens = 0
+
+    def to_dict(self, duration: float) -> dict:
+        """Summarize the statistics for a run of the given duration."""
+        return {
+            "turns": self.turns,
+            "errors": sum(self.errors.values()),
+            "errors_by_type": self.errors,
+            "duration_seconds": round(duration, 3),
+            "time_to_headers_seconds": self.headers.summary(),
+            "total_latency_seconds": self.total.summary(),
+            "output_tokens": self.output_tokens,
+            "output_tokens_per_second": round(self.output_tokens / duration, 1) if duration else 0.0
+        }
+
+
+async def _record_headers(response) -> None:
+    """HTTP response hook: note when the headers of the provider's first successful response arrived."""
+    timing = _turn_timing.get()
+    if timing is not None and response.is_success and "headers" not in timing:
+        timing["headers"] = time.perf_counter()
+
+
+def load_conversations(path: str) -> list[list[str]]:
+    """
+    Load multi-turn conversations from a JSONL file.
+
+    Each line is either a list of user messages or an object with a "turns" list.
+
+    Args:
+        path: Path to the JSONL file
+
+    Returns:
+        List of conversations (each a list of user messages)
+    """
+    conversations = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            turns = entry if isinstance(entry, list) else entry["turns"]
+            conversations.append([str(turn) for turn in turns])
+    return conversations
+
+
+async def run_conversation(
+    service: AIService,
+    session_id: str,
+    turns: list[str],
+    semaphore: asyncio.Semaphore,
+    stats: dict[str, BatchStats]
+) -> None:
+    """Replay one conversation turn by turn, recording timing for each turn."""
+    async with semaphore:
+        for turn in turns:
+            timing = {}
+            _turn_timing.set(timing)
+            start = time.perf_counter()
+            try:
+                result = await service.generate_reply(session_id, turn)
+            except Exception as e:
+                key = f"{service.provider.get_provider_name()} · {service.provider.model}"
+                turn_stats = stats.setdefault(key, BatchStats())
+                turn_stats.turns += 1
+                error_type = type(e).__name__
+                turn_stats.errors[error_type] = turn_stats.errors.get(error_type, 0) + 1
+                continue
+            end = time.perf_counter()
+
+            key = f"{service.provider.get_provider_name()} · {result.model}"
+            turn_stats = stats.setdefault(key, BatchStats())
+            turn_stats.turns += 1
+
+            # Replies are sent as one WhatsApp message, so providers are called without
+            # streaming: response headers arrive once the full reply is generated, which
+            # makes this server time rather than time-to-first-token. Cached answers
+            # never reach the provider.
+            turn_stats.headers.add(timing.get("headers", end) - start)
+            turn_stats.total.add(end - start)
+            turn_stats.output_tokens += result.output_tokens
+
+
+def print_report(stats: dict[str, BatchStats], duration: float) -> None:
+    """Print a benchmark report."""
+    for key, turn_stats in stats.items():
+        summary = turn_stats.to_dict(duration)
+        headers = summary["time_to_headers_seconds"]
+        total = summary["total_latency_seconds"]
+        print("-" * 70)
+        print(f"📊 {key}")
+        print(f"   Turns: {summary['turns']}  Errors: {summary['errors']}  Duration: {duration:.2f}s")
+        if headers["count"]:
+            print(f"   Headers (s): p50 {headers['p50']:.3f}  p90 {headers['p90']:.3f}  p99 {headers['p99']:.3f}")
+            print(f"   Total (s):   p50 {total['p50']:.3f}  p90 {total['p90']:.3f}  p99 {total['p99']:.3f}")
+        print(f"   Output:      {summary['output_tokens']} tokens"
+              f" · {summary['output_tokens_per_second']} tokens/s")
+        for error_type, count in turn_stats.errors.items():
+            print(f"   ❌ {error_type}: {count}")
+
+
+async def batch_benchmark(
+    path: str,
+    concurrency: int,
+    providers: list[str],
+    base_url: str | None = None,
+    json_path: str | None = None
+) -> None:
+    """
+    Replay conversations concurrently against each provider and report latency.
+
+    Args:
+        path: JSONL file of conversations
+        concurrency: Maximum number of conversations running at once
+        providers: Provider types to benchmark (e.g. ["groq", "openai"])
+        base_url: Optional API base URL override (e.g. a local fake completion server)
+        json_path: Optional path to write the report as JSON
+    """
+    conversations = load_conversations(path)
+    print("=" * 70)
+    print(f"🏁 Batch benchmark: {len(conversations)} conversations, "
+          f"{sum(len(turns) for turns in conversations)} turns, concurrency {concurrency}")
+    if base_url:
+        print(f"   Provider base URL: {base_url}")
+    print("=" * 70)
+
+    report = {}
+    for provider_type in providers:
+        provider = AIProviderFactory.create_provider(provider_type, base_url=base_url)
+        for key in provider.key_pool.keys:
+            key.http_client.event_hooks["response"].append(_record_headers)
+        service = AIService(provider=provider)
+        await service.start()
+
+        stats: dict[str, BatchStats] = {}
+        semaphore = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(
+                run_conversation(service, f"batch-{provider_type}-{i}", turns, semaphore, stats)
+                for i, turns in enumerate(conversations)
+            ))
+        finally:
+            duration = time.perf_counter() - start
+            await service.close()
+
+        print_report(stats, duration)
+        report.update({key: turn_stats.to_dict(duration) for key, turn_stats in stats.items()})
+
+    print("=" * 70)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {json_path}")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Chat with the AI bot or benchmark it in batch mode")
+    parser.add_argument("--batch", metavar="JSONL", help="Replay conversations from a JSONL file instead of chatting")
+    parser.add_argument("--concurrency", type=int, default=8, help="Conversations run concurrently in batch mode")
+    parser.add_argument("--providers", default=settings.ai_provider,
+                        help="Comma-separated providers to benchmark (groq,openai,claude)")
+    parser.add_argument("--base-url", help="Provider API base URL, e.g. http://127.0.0.1:9000 for fake_completion_server.py")
+    parser.add_argument("--json", dest="json_path", help="Write the batch report to this JSON file")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    print("\n🚀 Starting AI service...\n")
-    asyncio.run(interactive_chat())
+    args = parse_args()
+    if args.batch:
+        asyncio.run(batch_benchmark(
+            path=args.batch,
+            concurrency=args.concurrency,
+            providers=[provider.strip() for provider in args.providers.split(",") if provider.strip()],
+            base_url=args.base_url,
+            json_path=args.json_path
+        ))
+    else:
+        print("\n🚀 Starting AI service...\n")
+        asyncio.run(interactive_chat())
 
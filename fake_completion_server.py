@@ -0,0 +1,182 @@
+"""
+Fake Completion Server - offline stand-in for the AI provider APIs
+Serves OpenAI/Groq-compatible chat completions and Anthropic messages with
+configurable latency, so provider and config changes can be benchmarked
+without network access or API costs.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Fake Completion Server")
+
+# Simulation settings (overridden from the command line)
+config = {
+    "latency": 0.3,
+    "token_latency": 0.005,
+    "reply_tokens": 60,
+    "error_rate": 0.0,
+    "requests_per_minute": 0
+}
+
+# Requests per API key in the current one-minute window
+rate_windows: dict[str, dict] = {}
+
+WORDS = ["sure", "happy", "to", "help", "with", "that", "here", "is", "a", "quick", "answer", "for", "you"]
+
+
+async def simulate_generation(max_tokens: int) -> tuple[str, int] | None:
+    """
+    Wait like a real provider would and produce a reply.
+
+    Args:
+        max_tokens: Requested token limit
+
+    Returns:
+        Tuple of (reply text, output tokens), or None to simulate a failure
+    """
+    output_tokens = min(config["reply_tokens"], max_tokens)
+    await asyncio.sleep(config["latency"] + output_tokens * config["token_latency"])
+    if random.random() < config["error_rate"]:
+        return None
+    text = " ".join(WORDS[i % len(WORDS)] for i in range(output_tokens))
+    return text, output_tokens
+
+
+def check_rate_limit(request: Request, anthropic: bool = False) -> tuple[dict, bool]:
+    """
+    Simulate a per-key requests-per-minute limit.
+
+    Args:
+        request: Incoming request (the API key identifies the bucket)
+        anthropic: Use Anthropic header names instead of OpenAI/Groq ones
+
+    Returns:
+        Tuple of (rate-limit headers, whether the request is over the limit)
+    """
+    limit = config["requests_per_minute"]
+    if not limit:
+        return {}, False
+
+    api_key = request.headers.get("x-api-key") or request.headers.get("authorization", "")
+    minute = int(time.time() // 60)
+    window = rate_windows.setdefault(api_key, {"minute": minute, "count": 0})
+    if window["minute"] != minute:
+        window.update(minute=minute, count=0)
+    window["count"] += 1
+
+    remaining = max(limit - window["count"], 0)
+    reset = 60 - time.time() % 60
+    if anthropic:
+        headers = {
+            "anthropic-ratelimit-requests-limit": str(limit),
+            "anthropic-ratelimit-requests-remaining": str(remaining),
+            "anthropic-ratelimit-requests-reset": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + reset))
+        }
+    else:
+        headers = {
+            "x-ratelimit-limit-requests": str(limit),
+            "x-ratelimit-remaining-requests": str(remaining),
+            "x-ratelimit-reset-requests": f"{reset:.1f}s"
+        }
+    if window["count"] > limit:
+        headers["retry-after"] = f"{reset:.0f}"
+        return headers, True
+    return headers, False
+
+
+def count_input_tokens(messages: list[dict], system: str = "") -> int:
+    """Roughly estimate input tokens (about 4 characters per token)."""
+    chars = len(system) + sum(len(str(message.get("content", ""))) for message in messages)
+    return max(1, chars // 4)
+
+
+@app.post("/chat/completions")
+@app.post("/v1/chat/completions")
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    """OpenAI/Groq-compatible chat completion endpoint."""
+    body = await request.json()
+    headers, limited = check_rate_limit(request)
+    if limited:
+        return JSONResponse(status_code=429, headers=headers, content={"error": {"message": "Rate limit reached"}})
+
+    result = await simulate_generation(body.get("max_tokens") or 1024)
+    if result is None:
+        return JSONResponse(status_code=500, content={"error": {"message": "Simulated failure"}})
+
+    text, output_tokens = result
+    input_tokens = count_input_tokens(body.get("messages", []))
+    return JSONResponse(headers=headers, content={
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake-model"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": input_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        }
+    })
+
+
+@app.post("/v1/messages")
+async def messages(request: Request):
+    """Anthropic-compatible messages endpoint."""
+    body = await request.json()
+    headers, limited = check_rate_limit(request, anthropic=True)
+    if limited:
+        return JSONResponse(status_code=429, headers=headers, content={"type": "error", "error": {"type": "rate_limit_error", "message": "Rate limit reached"}})
+
+    result = await simulate_generation(body.get("max_tokens") or 1024)
+    if result is None:
+        return JSONResponse(status_code=500, content={"type": "error", "error": {"type": "api_error", "message": "Simulated failure"}})
+
+    text, output_tokens = result
+    return JSONResponse(headers=headers, content={
+        "id": f"msg_{uuid.uuid4().hex}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "fake-model"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": count_input_tokens(body.get("messages", []), str(body.get("system", ""))),
+            "output_tokens": output_tokens
+        }
+    })
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake AI provider API for offline benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=config["latency"], help="Base latency per request (seconds)")
+    parser.add_argument("--token-latency", type=float, default=config["token_latency"], help="Extra latency per output token (seconds)")
+    parser.add_argument("--reply-tokens", type=int, default=config["reply_tokens"], help="Output tokens per reply")
+    parser.add_argument("--error-rate", type=float, default=config["error_rate"], help="Fraction of requests that fail (0-1)")
+    parser.add_argument("--requests-per-minute", type=int, default=config["requests_per_minute"],
+                        help="Per-API-key request limit with rate-limit headers (0 = unlimited)")
+    args = parser.parse_args()
+
+    config.update(
+        latency=args.latency,
+        token_latency=args.token_latency,
+        reply_tokens=args.reply_tokens,
+        error_rate=args.error_rate,
+        requests_per_minute=args.requests_per_minute
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
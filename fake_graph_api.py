@@ -0,0 +1,85 @@
+"""
+Fake Graph API - offline stand-in for the WhatsApp Business API
+Accepts message sends with configurable latency, failures and a
+throughput limit, so broadcasts and webhook replies can be tested locally.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Fake Graph API")
+
+# Simulation settings (overridden from the command line)
+config = {
+    "latency": 0.05,
+    "error_rate": 0.0,
+    "rate_limit": 0.0
+}
+
+# Sends accepted in the current one-second window
+window = {"second": 0, "count": 0}
+stats = {"accepted": 0, "rate_limited": 0, "failed": 0}
+
+
+def error_response(status_code: int, code: int, message: str) -> JSONResponse:
+    """Build a Graph API style error response."""
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": "OAuthException", "code": code}}
+    )
+
+
+@app.post("/{version}/{phone_number_id}/messages")
+async def send_message(version: str, phone_number_id: str, request: Request):
+    """Accept a message send (text, template or read receipt)."""
+    body = await request.json()
+    await asyncio.sleep(config["latency"])
+
+    # Mark-as-read requests
+    if body.get("status") == "read":
+        return {"success": True}
+
+    second = int(time.monotonic())
+    if window["second"] != second:
+        window.update(second=second, count=0)
+    window["count"] += 1
+    if config["rate_limit"] and window["count"] > config["rate_limit"]:
+        stats["rate_limited"] += 1
+        return error_response(429, 130429, "Rate limit hit")
+
+    if random.random() < config["error_rate"]:
+        stats["failed"] += 1
+        return error_response(400, 131026, "Message undeliverable")
+
+    stats["accepted"] += 1
+    return {
+        "messaging_product": "whatsapp",
+        "contacts": [{"input": body.get("to"), "wa_id": body.get("to")}],
+        "messages": [{"id": f"wamid.{uuid.uuid4().hex}"}]
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    """Counts of accepted, rate-limited and failed sends."""
+    return stats
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake WhatsApp Graph API for offline tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=config["latency"], help="Latency per request (seconds)")
+    parser.add_argument("--error-rate", type=float, default=config["error_rate"], help="Fraction of sends that fail (0-1)")
+    parser.add_argument("--rate-limit", type=float, default=config["rate_limit"], help="Sends per second before 429 (0 = unlimited)")
+    args = parser.parse_args()
+
+    config.update(latency=args.latency, error_rate=args.error_rate, rate_limit=args.rate_limit)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,15 @@
+"""
+Shared setup for the test suite.
+
+Puts the project root on sys.path and provides dummy settings, so app modules
+can be imported without a .env file.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add project root to path and provide dummy settings (nothing is sent)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+for name in ("WHATSAPP_TOKEN", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_VERIFY_TOKEN", "GROQ_API_KEY"):
+    os.environ.setdefault(name, "test")
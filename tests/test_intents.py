@@ -0,0 +1,39 @@
+"""
+Tests for intent validation and reply rendering.
+
+Usage:
+    pytest tests/test_intents.py
+"""
+
+import pytest
+from pydantic import ValidationError
+from app.services.intents import Intent, IntentRouter
+
+
+@pytest.mark.parametrize("reply", ["Pick {0}", "Pick {}", 'use {"a": 1}', "Hi {", "Hi }", "{name.attr}", "{name:d}"])
+def test_reply_with_unsupported_fields_is_rejected(reply: str):
+    """Replies that would fail to render on every match are rejected when the intent is loaded."""
+    with pytest.raises(ValidationError):
+        Intent(name="bad", phrases=["x"], reply=reply)
+
+
+@pytest.mark.parametrize("pattern", [r"(?P<word>\w+) (?P=word)", r"(a)\1", r"(?i)help", r"(a)?(?(1)b|c)"])
+def test_pattern_that_breaks_the_combined_regex_is_rejected(pattern: str):
+    """Backreferences, conditionals and global inline flags are rejected when the intent is loaded."""
+    with pytest.raises(ValidationError):
+        Intent(name="bad", patterns=[pattern], reply="ok")
+
+
+def test_reply_renders_named_groups_and_escaped_braces():
+    """Named groups and the phone number are substituted; doubled braces and unknown fields stay literal."""
+    router = IntentRouter([
+        Intent(
+            name="order",
+            patterns=[r"order (?P<order_id>\d+)"],
+            reply='Order {order_id} for {phone_number}: {{"a": 1}} {unknown}'
+        )
+    ])
+    intent, variables = router.match("Order 42!")
+    assert router.render(intent, {"phone_number": "905551234567", **variables}) == (
+        'Order 42 for 905551234567: {"a": 1} {unknown}'
+    )
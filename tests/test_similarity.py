@@ -0,0 +1,37 @@
+"""
+Tests for the similar-question index: which rephrasings reuse a curated answer.
+
+Usage:
+    pytest tests/test_similarity.py
+"""
+
+import pytest
+from app.services.similarity import SimilarityIndex
+
+
+def curated_index(question: str) -> SimilarityIndex:
+    """An index holding one curated answer."""
+    index = SimilarityIndex()
+    index.add(question, "curated answer", curated=True)
+    return index
+
+
+@pytest.mark.parametrize("curated", ["What are your opening hours?", "What are your hours?"])
+@pytest.mark.parametrize("query", ["what r ur hours", "opening hours?"])
+def test_rephrasings_hit_one_curated_entry(curated: str, query: str):
+    """Both example rephrasings of the FAQ reuse the same curated answer, whichever wording was curated."""
+    assert curated_index(curated).lookup(query) == "curated answer"
+
+
+@pytest.mark.parametrize(("curated", "query"), [
+    ("How do I pay?", "When do I pay?"),
+    ("How do I pay?", "who do I pay"),
+    ("Can I return an item?", "How can I return an item?"),
+    ("When are you open?", "Where are you open?"),
+    ("Are you open on monday?", "Are you open on sunday?"),
+    ("I need 2 tickets", "I need 20 tickets"),
+    ("Can I return an item?", "Can I return a shirt?"),
+])
+def test_different_questions_miss(curated: str, query: str):
+    """Questions that differ in a question word, number or content word don't reuse the answer."""
+    assert curated_index(curated).lookup(query) is None